@@ -1,28 +1,38 @@
-import currency_coverter
 from utils import extract_first_numbers, extract_numbers
 from ListingScrapperBase import ListingScrapperBase
+from driver_pool import DriverPool
+from pipeline import ListingPipeline
+from archive import HtmlArchive
+from metrics import Metrics
+from browser import COMMON_BLOCKED_URLS, STYLESHEETS, BrowserProfile
+from fetchers import PageType
+from parsers import make_soup
+from field_specs import FieldExtractor, FieldSpec, Selector
 
 from datetime import datetime
 
+import re
 from enum import Enum
-from typing import Any, Optional, override
+from typing import Any, Iterable, Optional, override
 
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
 
-from bs4 import BeautifulSoup, NavigableString, ResultSet, Tag
+from bs4 import BeautifulSoup, NavigableString, ResultSet, SoupStrainer, Tag
 from urllib import parse
 
-from rich import print
-
 ESTATE_AM = r"https://www.estate.am/en/"
 
 
 class EstateAm(ListingScrapperBase):
     """The scrapper designed for estate.am"""
 
+    http_pages = frozenset({PageType.GALLERY})
+    gallery_page_link = re.compile(r'[?&;]page=(\d+)')  # `&amp;page=` in the attributes
+    blocked_urls = COMMON_BLOCKED_URLS + STYLESHEETS  # only the script of the map is waited for
+    map_data_selector = 'script[charset="utf-8"][src*="https://api-maps.yandex.ru/services/coverage/v2/"][src*="ll="]'
+
     @override
     class Endpoints(Enum):
 
@@ -40,60 +50,21 @@ class EstateAm(ListingScrapperBase):
     @override
     class SoupFinder:
 
-        @staticmethod
-        def address(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('strong', class_='addr')
-
-        @staticmethod
-        def price(soup: BeautifulSoup) -> ResultSet:
-            return soup.find_all('div', class_='price-w')
-
-        @staticmethod
-        def area(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('span', class_='ruler')
-
-        @staticmethod
-        def floors(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('span', class_='floor')
-
-        @staticmethod
-        def bathrooms(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            elements = soup.find_all('li', class_='active')
+        address = FieldSpec('address', Selector('strong', class_='addr'))
+        price = FieldSpec('price', Selector('div', class_='price-w'), many=True)
+        area = FieldSpec('area', Selector('span', class_='ruler'))
+        floors = FieldSpec('floors', Selector('span', class_='floor'))
+        bathrooms = FieldSpec('bathrooms', Selector('li', class_='active', predicate=lambda el: 'bathrooms' in el.text))
+        rooms = FieldSpec('rooms', Selector('span', class_='rooms'))
+        description = FieldSpec('description', Selector('p', string=True))
+        renovation = FieldSpec('renovation', Selector('li', class_='active', predicate=lambda el: 'Repairment:' in el.text))
+        coordinates = FieldSpec('coordinates', Selector(
+            'script', attrs={'charset': 'utf-8', 'src': True},
+            predicate=lambda script: 'https://api-maps.yandex.ru/services/coverage/v2/' in script['src']))
 
-            for el in elements:
-                if 'bathrooms' in el.text:
-                    return el
+        FIELDS = FieldExtractor([address, price, area, floors, bathrooms, rooms, description, renovation, coordinates])
 
-            return None
-
-        @staticmethod
-        def rooms(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('span', class_='rooms')
-
-        @staticmethod
-        def description(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('p', string=True)
-
-        @staticmethod
-        def renovation(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            elements = soup.find_all('li', class_='active')
-
-            for el in elements:
-                if 'Repairment:' in el.text:
-                    return el
-
-            return None
-
-        @staticmethod
-        def coordinates(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            scripts = soup.find_all('script', charset="utf-8", src=True)
-            for script in scripts:
-                if 'https://api-maps.yandex.ru/services/coverage/v2/' not in script['src']:
-                    continue
-
-                return script
-
-            raise AssertionError("Shouldn't be reachable! (could not find map element on page)")
+        gallery_strainer = SoupStrainer('a', class_='img', target='_blank', href=True)
 
         @staticmethod
         def listings_div(soup: BeautifulSoup) -> ResultSet:
@@ -103,9 +74,7 @@ class EstateAm(ListingScrapperBase):
     class SoupExtractor:
 
         @staticmethod
-        def price(soup: BeautifulSoup, rent_or_sale: str) -> str:
-
-            prices: ResultSet = EstateAm.SoupFinder.price(soup)
+        def price(prices: list[Tag], rent_or_sale: str) -> str:
 
             for price in prices:
                 label = price.find('span')
@@ -122,9 +91,7 @@ class EstateAm(ListingScrapperBase):
             return ''
 
         @staticmethod
-        def currency(soup: BeautifulSoup, rent_or_sale: str) -> str:
-
-            prices: ResultSet = EstateAm.SoupFinder.price(soup)
+        def currency(prices: list[Tag], rent_or_sale: str) -> str:
 
             for price in prices:
                 label = price.find('span')
@@ -149,12 +116,7 @@ class EstateAm(ListingScrapperBase):
             return ''
 
         @staticmethod
-        def coordinates(soup: BeautifulSoup) -> Optional[str]:
-
-            try:
-                coordinates: Optional[Tag | NavigableString] = EstateAm.SoupFinder.coordinates(soup)
-            except AssertionError:
-                return None
+        def coordinates(coordinates: Optional[Tag | NavigableString]) -> Optional[str]:
 
             if coordinates is None:
                 return None
@@ -176,9 +138,7 @@ class EstateAm(ListingScrapperBase):
             return None
 
         @staticmethod
-        def address(soup: BeautifulSoup) -> Optional[str]:
-
-            address: Optional[Tag | NavigableString] = EstateAm.SoupFinder.address(soup)
+        def address(address: Optional[Tag | NavigableString]) -> Optional[str]:
 
             if address is None:
                 return None
@@ -189,9 +149,7 @@ class EstateAm(ListingScrapperBase):
             return address.text
 
         @staticmethod
-        def area(soup: BeautifulSoup) -> Optional[float | str]:
-
-            area: Optional[Tag | NavigableString] = EstateAm.SoupFinder.area(soup)
+        def area(area: Optional[Tag | NavigableString]) -> Optional[float | str]:
 
             if area is None:
                 return None
@@ -202,13 +160,11 @@ class EstateAm(ListingScrapperBase):
             return extract_first_numbers(area.text)
 
         @staticmethod
-        def height(soup: BeautifulSoup) -> None:
+        def height() -> None:
             return None
 
         @staticmethod
-        def bathrooms(soup: BeautifulSoup) -> Optional[float | str]:
-
-            bathrooms: Optional[Tag | NavigableString] = EstateAm.SoupFinder.bathrooms(soup)
+        def bathrooms(bathrooms: Optional[Tag | NavigableString]) -> Optional[float | str]:
 
             if bathrooms is None:
                 return None
@@ -219,9 +175,7 @@ class EstateAm(ListingScrapperBase):
             return extract_first_numbers(bathrooms.text)
 
         @staticmethod
-        def rooms(soup: BeautifulSoup) -> Optional[float | str]:
-
-            rooms: Optional[Tag | NavigableString] = EstateAm.SoupFinder.rooms(soup)
+        def rooms(rooms: Optional[Tag | NavigableString]) -> Optional[float | str]:
 
             if rooms is None:
                 return None
@@ -232,9 +186,7 @@ class EstateAm(ListingScrapperBase):
             return extract_first_numbers(rooms.text)
 
         @staticmethod
-        def floor(soup: BeautifulSoup) -> Optional[float | str]:
-
-            floor: Optional[Tag | NavigableString] = EstateAm.SoupFinder.floors(soup)
+        def floor(floor: Optional[Tag | NavigableString]) -> Optional[float | str]:
 
             if floor is None:
                 return None
@@ -248,9 +200,7 @@ class EstateAm(ListingScrapperBase):
             return extract_first_numbers(floor.text)
 
         @staticmethod
-        def building_floors(soup: BeautifulSoup) -> Optional[float | str]:
-
-            floor: Optional[Tag | NavigableString] = EstateAm.SoupFinder.floors(soup)
+        def building_floors(floor: Optional[Tag | NavigableString]) -> Optional[float | str]:
 
             if floor is None:
                 return None
@@ -266,9 +216,7 @@ class EstateAm(ListingScrapperBase):
             return numbers[1] if len(numbers) > 1 else ""
 
         @staticmethod
-        def renovation(soup: BeautifulSoup) -> Optional[str]:
-
-            renovation: Optional[Tag | NavigableString] = EstateAm.SoupFinder.renovation(soup)
+        def renovation(renovation: Optional[Tag | NavigableString]) -> Optional[str]:
 
             if renovation is None:
                 return None
@@ -279,8 +227,7 @@ class EstateAm(ListingScrapperBase):
             return renovation.text.split(': ')[1]
 
         @staticmethod
-        def furniture(soup: BeautifulSoup) -> Optional[bool | str]:
-            description: Optional[Tag | NavigableString] = EstateAm.SoupFinder.description(soup)
+        def furniture(description: Optional[Tag | NavigableString]) -> Optional[bool | str]:
 
             if description is None:
                 return None
@@ -300,9 +247,11 @@ class EstateAm(ListingScrapperBase):
         @staticmethod
         def get_listing_data(html: str, url: str, rent_or_sale: str) -> dict[str, Any]:
 
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = make_soup(html, EstateAm.parser)
+
+            found: dict[str, Any] = EstateAm.SoupFinder.FIELDS.extract(soup)
 
-            coordinates: str = EstateAm.SoupExtractor.coordinates(soup)
+            coordinates: Optional[str] = EstateAm.SoupExtractor.coordinates(found['coordinates'])
 
             x_coord: str = "0"
             y_coord: str = "0"
@@ -317,44 +266,47 @@ class EstateAm(ListingScrapperBase):
                 "id": url[-6:],
                 "links": url,
                 "source": ESTATE_AM,
-                "address": EstateAm.SoupExtractor.address(soup),
+                "address": EstateAm.SoupExtractor.address(found['address']),
                 "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 "SHAPE": {
                     "x": x_coord,
                     "y": y_coord,
                     'spatialReference': {'wkid': 4326, 'latestWkid': 4326}
                 },
-                "square_meters": EstateAm.SoupExtractor.area(soup),
-                "building_floors": EstateAm.SoupExtractor.building_floors(soup),
-                "floor": EstateAm.SoupExtractor.floor(soup),
-                "furniture": EstateAm.SoupExtractor.furniture(soup),
-                "height": EstateAm.SoupExtractor.height(soup),
-                "renovation": EstateAm.SoupExtractor.renovation(soup),
-                "rooms": EstateAm.SoupExtractor.rooms(soup),
-                "bathroom": EstateAm.SoupExtractor.bathrooms(soup),
+                "square_meters": EstateAm.SoupExtractor.area(found['area']),
+                "building_floors": EstateAm.SoupExtractor.building_floors(found['floors']),
+                "floor": EstateAm.SoupExtractor.floor(found['floors']),
+                "furniture": EstateAm.SoupExtractor.furniture(found['description']),
+                "height": EstateAm.SoupExtractor.height(),
+                "renovation": EstateAm.SoupExtractor.renovation(found['renovation']),
+                "rooms": EstateAm.SoupExtractor.rooms(found['rooms']),
+                "bathroom": EstateAm.SoupExtractor.bathrooms(found['bathrooms']),
             }
 
-            price = EstateAm.SoupExtractor.price(soup, rent_or_sale)
-
-            if price:
-                data["price"] = currency_coverter.convert(
-                    float(price),
-                    EstateAm.SoupExtractor.currency(soup, rent_or_sale), 'USD')
-            else:
-                data["price"] = None
+            price = EstateAm.SoupExtractor.price(found['price'], rent_or_sale)
 
-            if data['price'] and data['square_meters']:
-                data['price_per_meter'] = float(data['price']) / float(data['square_meters'])
-            else:
-                data['price_per_meter'] = ""
+            data["raw_price"] = float(price) if price else None
+            data["currency"] = EstateAm.SoupExtractor.currency(found['price'], rent_or_sale)
+            data["price_per_meter"] = None  # computed with the price by the normalization
 
             return data
 
     def __init__(self,
                  webdriver: WebDriver,
                  limit_per_category: Optional[int] = None,
-                 processed: Optional[list[str]] = None) -> None:
-        super().__init__(webdriver, url=ESTATE_AM, limit_per_category=limit_per_category, processed=processed)
+                 processed: Optional[Iterable[str]] = None,
+                 driver_pool: Optional[DriverPool] = None,
+                 checkpoint_dir: Optional[str] = None,
+                 stop_after_known_pages: Optional[int] = None,
+                 pipeline: Optional[ListingPipeline] = None,
+                 archive: Optional[HtmlArchive] = None,
+                 metrics: Optional[Metrics] = None,
+                 browser_profile: Optional[BrowserProfile] = None,
+                 url: str = ESTATE_AM) -> None:
+        super().__init__(webdriver, url=url, limit_per_category=limit_per_category, processed=processed,
+                         driver_pool=driver_pool, checkpoint_dir=checkpoint_dir,
+                         stop_after_known_pages=stop_after_known_pages, pipeline=pipeline,
+                         archive=archive, metrics=metrics, browser_profile=browser_profile)
 
     @override
     def set_page(self, page: int) -> None:
@@ -362,24 +314,9 @@ class EstateAm(ListingScrapperBase):
         self.options = f"?page={self.current_page}&view=gallery"
 
     @override
-    def get_listings_links_from_gallery(self, url: str) -> list[str]:
-        """Finds the endpoints to each listing on the url.
-
-        :param url: The url of the page to open
-        :raises TimeoutException:
-        :returns: The list of the listings endpoints
-        """
-        self.webdriver.get(url)
-        self.wait.until(ec.url_to_be(url))
+    def wait_for_gallery(self) -> None:
         self.wait.until(ec.element_to_be_clickable((By.XPATH, self.XPaths.FIRST_LISTING_OF_PAGE.value)))
 
-        return super().get_listings_links_from_gallery(url)
-
     @override
     def open_map(self) -> bool:
-        try:
-            self.wait.until(ec.element_to_be_clickable((By.CLASS_NAME, 'ymaps-2-1-79-copyright__link')))
-            return True
-        except TimeoutException:
-            print("Map couldn't open!")
-            return False
+        return self.wait_for_map_data()
@@ -1,8 +1,16 @@
 from utils import extract_first_numbers, extract_numbers
 from ListingScrapperBase import ListingScrapperBase
+from driver_pool import DriverPool
+from pipeline import ListingPipeline
+from archive import HtmlArchive
+from metrics import Metrics
+from browser import BrowserProfile
+from parsers import make_soup
+from field_specs import FieldExtractor, FieldSpec, Selector
 
 from datetime import datetime
 
+import re
 from enum import Enum
 from typing import Any, Iterable, Final, Optional, override
 
@@ -13,17 +21,17 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import TimeoutException
 
-from bs4 import BeautifulSoup, NavigableString, ResultSet, Tag
+from bs4 import BeautifulSoup, NavigableString, ResultSet, SoupStrainer, Tag
 from urllib import parse
 
-import currency_coverter
-
 LIST_AM_LINK: Final[str] = r"https://www.list.am/en/"
 
 
 class ListAm(ListingScrapperBase):
     """The scrapper designed for list.am"""
 
+    gallery_page_link = re.compile(r'href="/en/category/\d+/(\d+)')
+
     @override
     class Endpoints(Enum):
 
@@ -42,21 +50,17 @@ class ListAm(ListingScrapperBase):
     @override
     class SoupFinder:
 
-        @staticmethod
-        def address(soup: BeautifulSoup) -> Tag | NavigableString | None:
-            return soup.find('a', href='#', onclick=True)
-
-        @staticmethod
-        def price(soup: BeautifulSoup) -> Tag | NavigableString | None:
-            return soup.find('span', class_='price x')
+        address = FieldSpec('address', Selector('a', attrs={'href': '#', 'onclick': True}))
+        price = FieldSpec('price', Selector('span', class_='price x'))
+        currency = FieldSpec('currency', Selector('meta', attrs={'itemprop': 'priceCurrency'}))
+        coordinates = FieldSpec('coordinates', Selector(
+            'a', class_='ymaps-2-1-79-copyright__logo ymaps-2-1-79-copyright__logo_lang_en'))
+        miscellaneous = FieldSpec('miscellaneous', Selector('div', class_='c', within=Selector('div', class_='attr g')),
+                                  many=True)
 
-        @staticmethod
-        def currency(soup: BeautifulSoup) -> Tag | NavigableString | None:
-            return soup.find('meta', itemprop='priceCurrency')
+        FIELDS = FieldExtractor([address, price, currency, coordinates, miscellaneous])
 
-        @staticmethod
-        def coordinates(soup: BeautifulSoup) -> Tag | NavigableString | None:
-            return soup.find('a', class_='ymaps-2-1-79-copyright__logo ymaps-2-1-79-copyright__logo_lang_en')
+        gallery_strainer = SoupStrainer('div', class_='gl')
 
         @staticmethod
         def listings_div(soup: BeautifulSoup) -> ResultSet[Tag]:
@@ -66,17 +70,15 @@ class ListAm(ListingScrapperBase):
     class SoupExtractor:
 
         @staticmethod
-        def price(soup: BeautifulSoup) -> Optional[str]:
-            """Extracts the price from the soupified listing page.
+        def price(price: Tag | NavigableString | None) -> Optional[str]:
+            """Extracts the price from its element in the listing page.
 
             *If none are found it defaults to 0*
 
-            :param soup: The soupified listing page
+            :param price: The found price element
             :returns: The found string of the price in the soup
             """
 
-            price: Tag | NavigableString | None = ListAm.SoupFinder.price(soup)
-
             if price is None:
                 return None
 
@@ -89,13 +91,12 @@ class ListAm(ListingScrapperBase):
             return str(price.attrs['content'])
 
         @staticmethod
-        def currency(soup: BeautifulSoup) -> Optional[str]:
-            """Extracts the currency from the soupified listing page.
+        def currency(currency: Tag | NavigableString | None) -> Optional[str]:
+            """Extracts the currency from its element in the listing page.
 
-            :param soup: The soupified listing page
+            :param currency: The found currency element
             :returns: The found string of the currency in the soup
             """
-            currency: Tag | NavigableString | None = ListAm.SoupFinder.currency(soup)
 
             if currency is None:
                 return None
@@ -109,15 +110,13 @@ class ListAm(ListingScrapperBase):
             return str(currency.attrs['content'])  # type: ignore
 
         @staticmethod
-        def coordinates(soup: BeautifulSoup) -> Optional[str]:
-            """Extracts the coordinates from the soupified listing page.
+        def coordinates(coordinates: Optional[Tag | NavigableString]) -> Optional[str]:
+            """Extracts the coordinates from the yandex logo in the listing page.
 
-            :param soup: The soupified listing page
+            :param coordinates: The found yandex logo element
             :returns: The found string of the coordinates in the soup
             """
 
-            coordinates: Optional[Tag | NavigableString] = ListAm.SoupFinder.coordinates(soup)
-
             if coordinates is None:
                 return None
 
@@ -138,15 +137,13 @@ class ListAm(ListingScrapperBase):
             return None
 
         @staticmethod
-        def address(soup: BeautifulSoup) -> Optional[str]:
-            """Extracts the address from the soupified lexcept TimeoutException:isting page.
+        def address(address: Tag | NavigableString | None) -> Optional[str]:
+            """Extracts the address from its element in the listing page.
 
-            :param soup: The soupified listing page
+            :param address: The found address element
             :returns: The found string of the address in the soup
             """
 
-            address: Tag | NavigableString | None = ListAm.SoupFinder.address(soup)
-
             if address is None:
                 return None
 
@@ -156,74 +153,63 @@ class ListAm(ListingScrapperBase):
             return address.text
 
         @staticmethod
-        def miscellaneous(soup: BeautifulSoup) -> dict[str, Any]:
-            """Extracts the rest of the data on the page from the soupified listing page.
+        def miscellaneous(divs: list[Tag]) -> dict[str, Any]:
+            """Extracts the rest of the data on the page from the attributes divs of the listing page.
 
             Most of the data is organized in a weird way, scrapping it all was easier.
 
-            :param soup: The soupified listing page
+            :param divs: The found attributes divs
             :returns: The found string of the currency in the soup
             """
 
-            categories: ResultSet[Tag] = soup.find_all('div', class_='attr g')
-
             miscellaneous: dict[str, str] = {}
 
-            for category in categories:
-                divs: ResultSet[Tag] = category.find_all('div', class_='c')
-
-                for div in divs:
-                    title: Tag | NavigableString | None = div.find('div', class_='t')
-                    info: Tag | NavigableString | None = div.find('div', class_='i')
+            for div in divs:
+                title: Tag | NavigableString | None = div.find('div', class_='t')
+                info: Tag | NavigableString | None = div.find('div', class_='i')
 
-                    if title is None or info is None:
-                        continue
+                if title is None or info is None:
+                    continue
 
-                    miscellaneous[title.text] = info.text
+                miscellaneous[title.text] = info.text
 
             return ListAm.SoupExtractor._parse_miscellaneous_titles(miscellaneous)
 
         # @override
         @staticmethod
-        def get_listing_data(html: str, url: str) -> dict[str, Any]:
+        def get_listing_data(html: str, url: str, rent_or_sale: Optional[str] = None) -> dict[str, Any]:
+
+            soup = make_soup(html, ListAm.parser)
 
-            soup = BeautifulSoup(html, 'html.parser')
+            found: dict[str, Any] = ListAm.SoupFinder.FIELDS.extract(soup)
 
             x_coord: str = ""
             y_coord: str = ""
 
-            coordinates: Optional[str] = ListAm.SoupExtractor.coordinates(soup)
+            coordinates: Optional[str] = ListAm.SoupExtractor.coordinates(found['coordinates'])
             if coordinates is not None:
                 splitted_coordinates: list[str] = coordinates.split(',')
                 x_coord = splitted_coordinates[0]
                 y_coord = splitted_coordinates[1]
 
             data: dict[str, Any] = {
-                                       "id": extract_first_numbers(url),
+                                       "id": extract_first_numbers(parse.urlsplit(url).path),  # not the port of another host
                                        "links": url,
                                        "source": LIST_AM_LINK,
-                                       "address": ListAm.SoupExtractor.address(soup),
+                                       "address": ListAm.SoupExtractor.address(found['address']),
                                        "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                                        "SHAPE": {
                                            "x": x_coord,
                                            "y": y_coord,
                                            'spatialReference': {'wkid': 4326, 'latestWkid': 4326}
                                        },
-                                   } | ListAm.SoupExtractor.miscellaneous(soup)
+                                   } | ListAm.SoupExtractor.miscellaneous(found['miscellaneous'])
 
-            price = ListAm.SoupExtractor.price(soup)
-
-            if price:
-                data["price"] = currency_coverter.convert(
-                    float(price),
-                    ListAm.SoupExtractor.currency(soup), 'USD')
-            else:
-                data["price"] = None
+            price = ListAm.SoupExtractor.price(found['price'])
 
-            if data['price'] and data['square_meters']:
-                data['price_per_meter'] = data['price'] / float(data['square_meters'])
-            else:
-                data['price_per_meter'] = None
+            data["raw_price"] = float(price) if price else None
+            data["currency"] = ListAm.SoupExtractor.currency(found['currency'])
+            data["price_per_meter"] = None  # computed with the price by the normalization
 
             return data
 
@@ -277,8 +263,22 @@ class ListAm(ListingScrapperBase):
 
             return parsed
 
-    def __init__(self, webdriver: WebDriver, limit_per_category: Optional[int] = None, processed: Optional[list[str]] = None):
-        super().__init__(webdriver=webdriver, url=LIST_AM_LINK, limit_per_category=limit_per_category, processed=processed)
+    def __init__(self,
+                 webdriver: WebDriver,
+                 limit_per_category: Optional[int] = None,
+                 processed: Optional[Iterable[str]] = None,
+                 driver_pool: Optional[DriverPool] = None,
+                 checkpoint_dir: Optional[str] = None,
+                 stop_after_known_pages: Optional[int] = None,
+                 pipeline: Optional[ListingPipeline] = None,
+                 archive: Optional[HtmlArchive] = None,
+                 metrics: Optional[Metrics] = None,
+                 browser_profile: Optional[BrowserProfile] = None,
+                 url: str = LIST_AM_LINK):
+        super().__init__(webdriver=webdriver, url=url, limit_per_category=limit_per_category, processed=processed,
+                         driver_pool=driver_pool, checkpoint_dir=checkpoint_dir,
+                         stop_after_known_pages=stop_after_known_pages, pipeline=pipeline,
+                         archive=archive, metrics=metrics, browser_profile=browser_profile)
 
     @override
     def set_page(self, page: int) -> None:
@@ -310,11 +310,3 @@ class ListAm(ListingScrapperBase):
 
         return True
 
-    @override
-    def get_listings_links_from_gallery(self, url: str) -> list[str]:
-
-        self.webdriver.get(url)
-        self.wait.until(ec.url_to_be(url))
-
-        return super().get_listings_links_from_gallery(url)
-
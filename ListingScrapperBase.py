@@ -1,10 +1,20 @@
+import copy
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
-from typing import Any, Protocol, Optional
+from collections.abc import Iterable, MutableSet
+from typing import Any, Callable, ContextManager, Final, Iterator, Protocol, Optional
+from urllib import parse
 
 import selenium
 import urllib3
 from alive_progress import alive_it
-from bs4 import BeautifulSoup, ResultSet, Tag
+from bs4 import BeautifulSoup, ResultSet, SoupStrainer, Tag
+import pandas as pd
 from pandas import DataFrame
 
 from selenium.common import TimeoutException
@@ -12,23 +22,101 @@ from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as ec
 
+from archive import ArchiveEntry, HtmlArchive
+from browser import COMMON_BLOCKED_URLS, BrowserProfile, PageWeight, block, page_weight
+from driver_pool import DriverPool
+from metrics import Metrics
+from fetchers import HttpFetcher, NoListingsError, PageLoadError, PageRedirectError, PageType
+from normalization import normalize_prices
+from parsers import DEFAULT_PARSER, make_soup
+from pipeline import ListingPipeline
+from storage import ListingWriter
+from checkpoints import CrawlCheckpoint
+
+COLUMNS: Final[list[str]] = ['id', 'price', 'rooms', 'square_meters', 'address', 'date', 'source', 'furniture',
+                             'renovation', 'price_per_meter', 'floor', 'building_floors', 'height', 'bathroom',
+                             'rent_or_sale', 'links', 'SHAPE', 'type', 'raw_price', 'currency']
+
+GALLERY_FAILURES: Final[int] = 3  # consecutive gallery pages that couldn't be loaded before the site is deemed down
+MAP_POLL_FREQUENCY: Final[float] = 0.1  # seconds between two looks for the data of the map
+NO_MAP_GRACE: Final[float] = 3  # seconds a loaded page without any yandex map is given before it is deemed mapless
+
+# what the page holds of the map: its data, the map still loading, nothing yet or nothing at all
+MAP_STATE_SCRIPT: Final[str] = """
+if (document.querySelector(arguments[0])) return 'data';
+if (document.querySelector('script[src*="api-maps.yandex"], [class*="ymaps"]')) return 'map';
+return document.readyState === 'complete' ? 'none' : 'loading';
+"""
+
+
+@dataclass(frozen=True)
+class ListingParser:
+    """Extracts the data of the listings pages of a category, without the scrapper.
+
+    It only holds the extraction function of the site and the category, so it can be sent to another process.
+    """
+    get_listing_data: Callable[[str, str, Optional[str]], dict[str, Any]]
+    listing_type: str
+    rent_or_sale: str
+
+    def __call__(self, url: str, page_source: str) -> dict[str, Any]:
+        return {
+            "type": self.listing_type,
+            "rent_or_sale": self.rent_or_sale,
+        } | self.get_listing_data(page_source, url, self.rent_or_sale)
+
+
+@dataclass(frozen=True)
+class GalleryPage:
+    """What was harvested on a gallery page."""
+    links: list[str]  # empty on the page after the last one
+    last_page: Optional[int] = None  # as shown by the pagination
+    failed: bool = False  # the page couldn't be loaded, unlike a page without listings
+
 
 class ListingScrapperBase(Protocol):
     """This is the base class upon which all scrapers will inherit from.
 
     :param webdriver: The webdriver to use.
-    :param url: the base url of the webpage.
+    :param url: the base url of the webpage, the sites default to their own but can be pointed elsewhere (e.g. a mirror).
     :param timeout_limit: The maximum number of seconds to wait for when loading something on the page.
     :param limit_per_category: An optional parameter to limit the number of listings per category for testing purposes.
     :param processed: An optional parameter that defines the links of the listings you consider already processed and don't want to consider when getting endpoints.
+        A set (or any other :class:`MutableSet`, e.g. an index on disk) is used as is, other iterables are copied into a set.
+    :param driver_pool: An optional pool of drivers the listings pages are distributed to, defaults to a pool of the given webdriver.
+    :param http_fetcher: An optional fetcher used for the pages in :attr:`http_pages`, defaults to a new :class:`HttpFetcher`.
+    :param archive: An optional archive the fetched pages are saved in, or read from in replay mode (then no webdriver is needed).
+    :param metrics: An optional record of the time spent in each stage and of the failures, shared between the scrappers.
+    :param browser_profile: An optional profile the browsers were started with, then they refuse the :attr:`blocked_urls`
+        and the bytes of each page are counted in the metrics.
+    :param pipeline: An optional pipeline overlapping the loading and the parsing of the listings, defaults to one on the driver pool.
+    :param stop_after_known_pages: An optional number of consecutive gallery pages with only processed listings after which
+        the pagination stops. The sites show the newest listings first, so it makes a daily run stop at the previous one.
+    :param checkpoint_dir: An optional directory to save the progress of the crawl in, so an interrupted :meth:`save_data` can be resumed.
     """
     url: str
     webdriver: WebDriver
     wait: WebDriverWait
+    timeout_limit: int
+    driver_pool: DriverPool
+    http_fetcher: HttpFetcher
+    pipeline: ListingPipeline
+    archive: Optional[HtmlArchive]
+    metrics: Metrics
+    browser_profile: Optional[BrowserProfile]
+    current_category: str
+    checkpoint_dir: Optional[str]
+    stop_after_known_pages: Optional[int]
+    http_pages: frozenset[PageType] = frozenset()  # the page types that don't need the browser
+    parser: str = DEFAULT_PARSER  # the bs4 tree builder used on the pages, for all sites or per site
+    gallery_page_link: Optional[re.Pattern[str]] = None  # captures the page numbers of the pagination of a gallery
+    map_data_selector: Optional[str] = None  # the css selector of the element the coordinates are read from
+    blocked_urls: tuple[str, ...] = COMMON_BLOCKED_URLS  # the resources the browser doesn't need to load for the site
+    gallery_workers: int
     options: str
     current_page: int
     limit_per_category: Optional[int]
-    processed_links: Optional[list[str]]
+    processed_links: MutableSet[str]
 
     class Endpoints(Enum):
         """Commonly used endpoints for categories in the website."""
@@ -46,9 +134,12 @@ class ListingScrapperBase(Protocol):
     class SoupFinder:
         """This is a helper class to find the elements in the page used by the SoupExtractor class.
 
-            It uses BeautifulSoup to find the wanted element.
+            The elements of a listing are described as :class:`FieldSpec`, and gathered in a single walk of the page
+            by a :class:`FieldExtractor`.
         """
 
+        gallery_strainer: Optional[SoupStrainer] = None  # the only tags of a gallery page worth parsing
+
         @staticmethod
         def listings_div(soup: BeautifulSoup) -> ResultSet[Tag]:
             """The function to find listings divs on the gallery.
@@ -75,16 +166,35 @@ class ListingScrapperBase(Protocol):
                  url: str,
                  timeout_limit: int = 20,
                  limit_per_category: Optional[int] = None,
-                 processed: Optional[list[str]] = None) -> None:
+                 processed: Optional[Iterable[str]] = None,
+                 driver_pool: Optional[DriverPool] = None,
+                 http_fetcher: Optional[HttpFetcher] = None,
+                 checkpoint_dir: Optional[str] = None,
+                 stop_after_known_pages: Optional[int] = None,
+                 pipeline: Optional[ListingPipeline] = None,
+                 archive: Optional[HtmlArchive] = None,
+                 metrics: Optional[Metrics] = None,
+                 browser_profile: Optional[BrowserProfile] = None) -> None:
 
         self.url = url
-        self.webdriver = webdriver
-        self.wait = WebDriverWait(webdriver, timeout_limit)
+        self.timeout_limit = timeout_limit
+        self.driver_pool = driver_pool or DriverPool.of(webdriver)
+        self.http_fetcher = http_fetcher or HttpFetcher(pool_size=self.driver_pool.size, timeout_limit=timeout_limit)
+        self.pipeline = pipeline or ListingPipeline(self.driver_pool)
+        self.archive = archive
+        self.metrics = metrics or Metrics()
+        self.browser_profile = browser_profile
+        self.current_category = ""  # the label of the metrics
+        self.use_driver(webdriver)
         self.current_page = 0
         self.options = ""
         self.reset_page()
         self.limit_per_category = limit_per_category
-        self.processed_links = processed or []
+        self.processed_links = processed if isinstance(processed, MutableSet) else set(processed or ())
+        self.checkpoint_dir = checkpoint_dir
+        self.gallery_workers = self.driver_pool.size  # gallery pages fetched at once
+        self.stop_after_known_pages = stop_after_known_pages
+        self._checkpoints: dict[str, CrawlCheckpoint] = {}
 
     def get_data_from_listings_of_category(self, category: Endpoints) -> list[dict[str, Any]]:
         """Gathers the data of all the listings of a given category.
@@ -92,7 +202,19 @@ class ListingScrapperBase(Protocol):
         :param category: The category to look into
         :returns: The list of the data collected
         """
-        listings_data: list[dict[str, Any]] = []
+        return list(self.iter_listings_of_category(category))
+
+    def iter_listings_of_category(self, category: Endpoints, keep_checkpoint: bool = False) -> Iterator[dict[str, Any]]:
+        """Yields the data of the listings of a given category as soon as they are extracted.
+
+        The crawl stops (without raising) on an interruption or if the drivers die, like :meth:`get_data_from_listings_of_category`.
+        With checkpoints, the checkpoint of the category is deleted once every listing was visited.
+
+        :param category: The category to look into
+        :param keep_checkpoint: Whether the checkpoint is left to the caller, which deletes it after saving the listings.
+        :returns: The iterator over the data of the listings
+        """
+        self.current_category = category.name
 
         try:
             if (category is self.Endpoints.APARTMENTS_RENTAL
@@ -107,39 +229,247 @@ class ListingScrapperBase(Protocol):
             else:
                 listing_type = 'houses'
 
-            listings_endpoints: list[str] = self.get_all_listings(category)
+            checkpoint: Optional[CrawlCheckpoint] = self.checkpoint(category)
+
+            listings_endpoints: list[str]
+
+            if checkpoint is not None and checkpoint.gallery_done:
+                listings_endpoints = checkpoint.endpoints
+                for endpoint in listings_endpoints:
+                    self.mark_processed(endpoint)
+            else:
+                listings_endpoints = self.get_all_listings(category)
 
-            for endpoint in alive_it(listings_endpoints,
-                                     title=f'Getting data from {category.name}',
-                                     bar='solid',
-                                     max_cols=300,
-                                     spinner='classic',
-                                     calibrate=10,
-                                     force_tty=True):
+            listings_urls: list[str] = [f"{self.url}{endpoint}" for endpoint in listings_endpoints]
 
-                url: str = f"{self.url}{endpoint}"
+            if checkpoint is not None:
+                listings_urls = [url for url in listings_urls if url not in checkpoint.completed]
 
+            def fetch(webdriver: WebDriver, url: str) -> Optional[str]:
                 try:
+                    html: Optional[str] = self.bound_to(webdriver).load_listing(url)
+                except (selenium.common.exceptions.WebDriverException, urllib3.exceptions.MaxRetryError):
+                    self.count('failures_total', stage='navigation')
+                    raise
+
+                if html is not None and self.archive is not None and not self.archive.replay:
+                    self.archive.save(url, html, PageType.LISTING, listing_type, rent_or_sale)
+
+                return html
+
+            parse = ListingParser(self.SoupExtractor.get_listing_data, listing_type, rent_or_sale)
+
+            def observe(seconds: float) -> None:
+                self.metrics.observe('stage_seconds', seconds, **self.labels(stage='parse'))
+
+            for data in alive_it(self.pipeline.run(fetch, parse, listings_urls, observe),
+                                 total=len(listings_urls),
+                                 title=f'Getting data from {category.name}',
+                                 bar='solid',
+                                 max_cols=300,
+                                 spinner='classic',
+                                 calibrate=10,
+                                 force_tty=True):
+
+                self.count('listings_total', outcome='skipped' if data is None else 'extracted')
+
+                if data is not None:
+                    yield data
+
+            self.pipeline.report()
+
+            if checkpoint is not None:
+                checkpoint.finished = True
+
+                if not keep_checkpoint:
+                    self.clear_checkpoint(category)
+
+        except (KeyboardInterrupt, selenium.common.exceptions.WebDriverException, urllib3.exceptions.MaxRetryError):
+            return
+
+        finally:
+            if self.driver_pool.drivers and self.webdriver not in self.driver_pool.drivers:
+                self.use_driver(self.driver_pool.primary)  # our driver died during the crawl
+
+    def get_listing(self, url: str, listing_type: str, rent_or_sale: str) -> Optional[dict[str, Any]]:
+        """Loads a listing page with the current webdriver and extracts its data.
+
+        :param url: The url of the listing page.
+        :param listing_type: The type of the listing (appartments or houses).
+        :param rent_or_sale: Whether the listing is for rent or for sale.
+        :return: The data of the listing, ``None`` if the page couldn't be loaded.
+        """
+        page_source: Optional[str] = self.load_listing(url)
+
+        if page_source is None:
+            return None
+
+        return self.extract_listing(page_source, url, listing_type, rent_or_sale)
+
+    def extract_listing(self, page_source: str, url: str, listing_type: str, rent_or_sale: str) -> dict[str, Any]:
+        """Extracts the data of a loaded listing page, it doesn't use the webdriver.
+
+        :param page_source: The html of the listing page.
+        :param url: The url of the listing page.
+        :param listing_type: The type of the listing (appartments or houses).
+        :param rent_or_sale: Whether the listing is for rent or for sale.
+        :return: The data of the listing.
+        """
+        return ListingParser(self.SoupExtractor.get_listing_data, listing_type, rent_or_sale)(url, page_source)
+
+    def load_archived(self, archive: HtmlArchive, url: str) -> Optional[str]:
+        """Replays a page from an archive.
+
+        :param archive: The archive of the crawl.
+        :param url: The url of the page.
+        :return: The html of the page, ``None`` if it isn't archived or its copy can't be read.
+        """
+        try:
+            return archive.load(url)
+        except PageLoadError:
+            print("Page isn't archived!")
+            self.count('skips_total', reason='not_archived')
+        except (OSError, EOFError, zlib.error):  # a missing or truncated copy
+            print("Couldn't read the archived page!")
+            self.count('skips_total', reason='corrupt_archive')
+
+        return None
+
+    def load_listing(self, url: str) -> Optional[str]:
+        """Loads a listing page, over HTTP if the site allows it, else in the browser.
+
+        :param url: The url of the listing page.
+        :return: The html of the page, ``None`` if it couldn't be loaded.
+        """
+        if self.archive is not None and self.archive.replay:
+            return self.load_archived(self.archive, url)
+
+        if PageType.LISTING in self.http_pages:
+            try:
+                with self.stage('navigation', page='listing'):
+                    return self.http_fetcher.fetch(url)
+            except PageLoadError:
+                print("Couldn't load page!")
+                self.count('skips_total', reason='fetch_failed')
+                return None
+
+        self.prepare_browser()
+
+        try:
+            try:
+                with self.stage('navigation', page='listing'):
                     self.webdriver.get(url)
+                with self.stage('wait', page='listing'):
                     self.wait.until(ec.url_to_be(url))
+            except TimeoutException:
+                print("Couldn't load page!")
+                self.count('timeouts_total', stage='wait')
+                self.count('skips_total', reason='timeout')
+                return None
+
+            with self.stage('open_map'):
+                map_opened: bool = self.open_map()
+
+            if not map_opened:
+                self.count('skips_total', reason='no_map')
+                return None
+
+            return self.webdriver.page_source
+        finally:
+            self.weigh_page('listing')  # even a failed page, its requests aren't counted against the next one
+
+    def load_gallery(self, url: str) -> str:
+        """Loads a gallery page, over HTTP if the site allows it, else in the browser.
+
+        :param url: The url of the gallery page.
+        :raises TimeoutException: If the page couldn't be loaded in the browser.
+        :raises PageLoadError: If the page couldn't be fetched.
+        :raises PageRedirectError: If the page redirected (past the last page).
+        :return: The html of the page.
+        """
+        if self.archive is not None and self.archive.replay:
+            return self.archive.load(url)
+
+        html: str
+
+        if PageType.GALLERY in self.http_pages:
+            with self.stage('navigation', page='gallery'):
+                html = self.http_fetcher.fetch(url)
+        else:
+            self.prepare_browser()
+
+            try:
+                with self.stage('navigation', page='gallery'):
+                    self.webdriver.get(url)  # returns once the page is loaded, no need to wait for a redirection
+
+                if self.webdriver.current_url != url:
+                    raise PageRedirectError(f"{url} redirected to {self.webdriver.current_url}")
+
+                try:
+                    with self.stage('wait', page='gallery'):
+                        self.wait_for_gallery()
                 except TimeoutException:
-                    print("Couldn't load page!")
-                    continue
+                    self.count('timeouts_total', stage='wait_for_gallery')
+                    raise
 
-                if not self.open_map():
-                    continue
+                html = self.webdriver.page_source
+            finally:
+                self.weigh_page('gallery')
 
-                listings_data.append(
-                    {
-                        "type": listing_type,
-                        "rent_or_Sale": rent_or_sale,
-                    } | self.SoupExtractor.get_listing_data(self.webdriver.page_source, url)
-                )
+        if self.archive is not None:
+            self.archive.save(url, html, PageType.GALLERY)
 
-            return listings_data
+        return html
 
-        except (KeyboardInterrupt, selenium.common.exceptions.WebDriverException, urllib3.exceptions.MaxRetryError):
-            return listings_data
+    def wait_for_gallery(self) -> None:
+        """Waits for the listings of a gallery page to be displayed in the browser.
+
+        :raises TimeoutException: If they never show up.
+        """
+        ...
+
+    def prepare_browser(self) -> None:
+        """Makes the browser refuse the :attr:`blocked_urls` of the site, when it was started with a profile."""
+        if self.browser_profile is not None:
+            block(self.webdriver, self.blocked_urls)
+
+    def weigh_page(self, page: str) -> None:
+        """Counts in the metrics the bytes the browser downloaded for the page and the requests it refused.
+
+        :param page: The kind of page, a label of the metrics.
+        """
+        if self.browser_profile is None or not self.browser_profile.log_network:
+            return
+
+        weight: Optional[PageWeight] = page_weight(self.webdriver)
+
+        if weight is None:
+            return
+
+        self.metrics.increment('page_bytes_total', weight.bytes, **self.labels(page=page))
+        self.metrics.increment('requests_total', weight.requests, **self.labels(page=page, outcome='loaded'))
+        self.metrics.increment('requests_total', weight.blocked, **self.labels(page=page, outcome='blocked'))
+
+    def use_driver(self, webdriver: WebDriver) -> None:
+        """Sets the webdriver used by the scrapper.
+
+        :param webdriver: The webdriver to use.
+        """
+        self.webdriver = webdriver
+        self.wait = WebDriverWait(webdriver, self.timeout_limit)
+
+    def bound_to(self, webdriver: WebDriver) -> 'ListingScrapperBase':
+        """Creates a shallow copy of the scrapper working with another webdriver.
+
+        The copy shares its state (processed links, pool, ...) with the scrapper, it is used to run
+        the per site logic (e.g. :meth:`open_map`) on the drivers of the pool.
+
+        :param webdriver: The webdriver the copy will use.
+        :return: The copy.
+        """
+        scrapper = copy.copy(self)
+        scrapper.use_driver(webdriver)
+        return scrapper
 
     def get_all_listings(self, category: Endpoints) -> list[str]:
         """Gets all listings from a given category.
@@ -150,53 +480,217 @@ class ListingScrapperBase(Protocol):
 
         print(f"Getting links for {category.name} ...")
 
+        self.current_category = category.name
+
+        checkpoint: Optional[CrawlCheckpoint] = self.checkpoint(category)
+
         endpoints: list[str] = []
+        known_pages: int = 0  # consecutive pages without any new listing
+        start: int = 0
+        pages: int = 0
 
-        while True:
-            url: str = f"{self.url}{category.value}{self.options}"
+        if checkpoint is not None:  # resume the gallery where the last run stopped
+            endpoints = list(checkpoint.endpoints)
+            for endpoint in endpoints:
+                self.mark_processed(endpoint)
+            start = checkpoint.next_page
 
-            try:
-                endpoints += self.get_listings_links_from_gallery(url)
-            except (TimeoutException, TimeoutError):
+        for page, links in self.iter_gallery_pages(category, start):
+            page_endpoints: list[str] = self.new_endpoints(links)
+            pages += 1
+
+            endpoints += page_endpoints
+
+            if checkpoint is not None:
+                checkpoint.record_gallery_page(page, page_endpoints)
+
+            known_pages = 0 if page_endpoints else known_pages + 1
+
+            if self.stop_after_known_pages and known_pages >= self.stop_after_known_pages:
+                print(f"Stopping after {known_pages} pages of known listings.")
                 break
 
             if self.limit_per_category and len(endpoints) >= self.limit_per_category:
                 break
 
-            self.next_page()
+        print(f"Got {len(endpoints)} listings from {pages} pages.")
 
-        print(f"Got {len(endpoints)} listings from {self.current_page + 1} pages.")
+        if checkpoint is not None:
+            checkpoint.finish_gallery()
 
         self.reset_page()
 
         return endpoints
 
-    def get_listings_links_from_gallery(self, url: str) -> list[str]:
-        """The method that extracts the links from a gallery page of listings fo a given url.
+    def iter_gallery_pages(self, category: Endpoints, start: int = 0) -> Iterator[tuple[int, list[str]]]:
+        """Yields the listings links of the gallery pages of a category in order, the pages being fetched concurrently.
 
-        :param url: The url of the gallery page.
-        :return: The list of links found on the page.
+        The number of pages is read from the pagination of the pages fetched so far (see :attr:`gallery_page_link`).
+        While it is unknown, the next :attr:`gallery_workers` pages are probed at once, up to the first page without listings.
+
+        A page that couldn't be loaded is tried again once, then skipped: only a page that loaded without listings
+        ends the gallery, or :data:`GALLERY_FAILURES` failed pages in a row.
+
+        :param category: The category to look into.
+        :param start: The first page.
+        :return: The iterator over the page numbers and the links of their listings.
         """
+        last_page: Optional[int] = None
+        page: int = start
+        failures: int = 0  # consecutive pages that couldn't be loaded
 
-        soup = BeautifulSoup(self.webdriver.page_source, 'html.parser')
+        while last_page is None or page <= last_page:
+            end: int = page + self.gallery_workers
 
-        listings_divs: ResultSet[Tag] = self.SoupFinder.listings_div(soup)
+            if last_page is not None:
+                end = min(end, last_page + 1)
 
-        endpoints: list[str] = []
+            numbers: range = range(page, end)
+            urls: list[str] = [self.gallery_url(category, number) for number in numbers]
+
+            harvested: list[GalleryPage] = self.harvest_galleries(urls)
+            failed: list[int] = [index for index, gallery_page in enumerate(harvested) if gallery_page.failed]
+
+            if failed:
+                self.metrics.increment('gallery_retries_total', len(failed), **self.labels())
 
-        for div in listings_divs:
-            listings_links: ResultSet[Tag] = div.find_all('a')
+                for index, gallery_page in zip(failed, self.harvest_galleries([urls[index] for index in failed])):
+                    harvested[index] = gallery_page
 
-            for links in listings_links:
-                if f"{self.url}{links['href'][4:]}" in self.processed_links:
+            for number, gallery_page in zip(numbers, harvested):
+                if gallery_page.failed:
+                    failures += 1
+                    self.count('gallery_pages_total', outcome='failed')
+
+                    if failures >= GALLERY_FAILURES:
+                        print(f"Stopping the gallery after {failures} pages that couldn't be loaded!")
+                        return
+
+                    print(f"Skipping the gallery page {number}, it couldn't be loaded!")
                     continue
-                endpoints.append(f"{links['href']}"[4:])  # we take out the `/en/`
-                self.processed_links.append(f"{self.url}{links['href']}"[4:])
 
-                if self.limit_per_category and len(endpoints) >= self.limit_per_category:
-                    return endpoints
+                failures = 0
 
-        return endpoints
+                if not gallery_page.links:  # past the last page
+                    return
+
+                self.count('gallery_pages_total', outcome='loaded')
+
+                if gallery_page.last_page is not None:
+                    last_page = max(last_page or 0, gallery_page.last_page)
+
+                yield number, gallery_page.links
+
+            page = end
+
+    def harvest_galleries(self, urls: list[str]) -> list[GalleryPage]:
+        """Loads gallery pages concurrently, over HTTP or on the drivers of the pool.
+
+        :param urls: The urls of the gallery pages.
+        :return: For each page, its listings links and the last page number it shows, or whether it failed.
+        """
+
+        def harvest(scrapper: 'ListingScrapperBase', url: str) -> GalleryPage:
+            try:
+                html: str = scrapper.load_gallery(url)
+
+                with scrapper.stage('parse', page='gallery'):
+                    return GalleryPage(scrapper.gallery_links(html, url), scrapper.last_gallery_page(html))
+            except (NoListingsError, PageRedirectError):
+                return GalleryPage([])
+            except (TimeoutException, TimeoutError):
+                return GalleryPage([], failed=True)
+
+        if PageType.GALLERY in self.http_pages:
+            with ThreadPoolExecutor(max_workers=max(len(urls), 1), thread_name_prefix='gallery') as executor:
+                return list(executor.map(lambda url: harvest(self, url), urls))
+
+        harvested = self.driver_pool.imap(lambda webdriver, url: harvest(self.bound_to(webdriver), url), urls)
+
+        return [gallery_page or GalleryPage([], failed=True) for gallery_page in harvested]  # None if the driver crashed
+
+    def gallery_url(self, category: Endpoints, page: int) -> str:
+        """Builds the url of a gallery page.
+
+        :param category: The category of the gallery.
+        :param page: The page number.
+        :return: The url of the page.
+        """
+        self.set_page(page)
+        return f"{self.url}{category.value}{self.options}"
+
+    def last_gallery_page(self, html: str) -> Optional[int]:
+        """Reads the highest page number linked by the pagination of a gallery page.
+
+        :param html: The html of the gallery page.
+        :return: The page number, ``None`` if the site or the page doesn't tell.
+        """
+        if self.gallery_page_link is None:
+            return None
+
+        return max((int(number) for number in self.gallery_page_link.findall(html)), default=None)
+
+    def gallery_links(self, html: str, url: str) -> list[str]:
+        """Extracts the endpoints of all the listings of a gallery page.
+
+        :param html: The html of the gallery page.
+        :param url: The url of the gallery page.
+        :raises NoListingsError: If there are no listings on the page.
+        :return: The endpoints found on the page, processed or not.
+        """
+        soup = make_soup(html, self.parser, parse_only=self.SoupFinder.gallery_strainer)
+
+        listings_divs: ResultSet[Tag] = self.SoupFinder.listings_div(soup)
+
+        if not listings_divs:
+            raise NoListingsError(f"No listings on {url}")
+
+        return [f"{link['href']}"[4:]  # we take out the `/en/`
+                for div in listings_divs
+                for link in ([div] if div.name == 'a' else div.find_all('a'))]  # estate.am finds the links themselves
+
+    def new_endpoints(self, endpoints: list[str]) -> list[str]:
+        """Keeps the endpoints that weren't processed yet, and marks them as processed.
+
+        :param endpoints: The endpoints of a gallery page.
+        :return: The new endpoints, at most :attr:`limit_per_category`.
+        """
+        new: list[str] = []
+
+        for endpoint in endpoints:
+            if self.is_processed(endpoint):
+                continue
+            new.append(endpoint)
+            self.mark_processed(endpoint)
+
+            if self.limit_per_category and len(new) >= self.limit_per_category:
+                break
+
+        return new
+
+    def get_listings_links_from_gallery(self, url: str) -> list[str]:
+        """The method that extracts the links from a gallery page of listings fo a given url.
+
+        :param url: The url of the gallery page.
+        :raises NoListingsError: If there are no listings on the page.
+        :return: The list of links found on the page.
+        """
+        return self.new_endpoints(self.gallery_links(self.load_gallery(url), url))
+
+    def is_processed(self, endpoint: str) -> bool:
+        """Checks if a listing was already processed.
+
+        :param endpoint: The endpoint of the listing.
+        :return: Whether its link is in the processed links.
+        """
+        return f"{self.url}{endpoint}" in self.processed_links
+
+    def mark_processed(self, endpoint: str) -> None:
+        """Adds a listing to the processed links.
+
+        :param endpoint: The endpoint of the listing.
+        """
+        self.processed_links.add(f"{self.url}{endpoint}")
 
     def set_page(self, page: int) -> None:
         """Sets page number of the listings' gallery.
@@ -217,6 +711,47 @@ class ListingScrapperBase(Protocol):
         """A method to handle the location of the url from the yandex map."""
         ...
 
+    def wait_for_map_data(self) -> bool:
+        """Waits for the element of :attr:`map_data_selector` the coordinates are read from, looking for it often.
+
+        A listing whose page finished loading without any yandex map has no map: it is kept without coordinates
+        after :data:`NO_MAP_GRACE` seconds instead of waiting for the whole timeout.
+
+        :return: Whether the listing can be extracted, ``False`` if the map never gave its data.
+        """
+        mapless_since: list[float] = []
+
+        def map_state(webdriver: WebDriver) -> Optional[str]:
+            state: str = webdriver.execute_script(MAP_STATE_SCRIPT, self.map_data_selector)
+
+            if state == 'data':
+                return state
+
+            if state != 'none':
+                mapless_since.clear()  # the map showed up after all
+                return None
+
+            if not mapless_since:
+                mapless_since.append(time.monotonic())
+
+            return state if time.monotonic() - mapless_since[0] >= NO_MAP_GRACE else None
+
+        try:
+            with self.stage('wait', page='map'):
+                state: str = WebDriverWait(self.webdriver, self.timeout_limit, MAP_POLL_FREQUENCY).until(map_state)
+        except TimeoutException:
+            print("Map couldn't open!")
+            self.count('timeouts_total', stage='map')
+            return False
+
+        if state == 'none':
+            print("No map on the page.")
+            self.count('maps_total', outcome='missing')
+        else:
+            self.count('maps_total', outcome='found')
+
+        return True
+
     def get_data_of_apartments_for_rent(self) -> list[dict[str, Any]]:
         return self.get_data_from_listings_of_category(self.Endpoints.APARTMENTS_RENTAL)
 
@@ -230,19 +765,210 @@ class ListingScrapperBase(Protocol):
         return self.get_data_from_listings_of_category(self.Endpoints.HOUSE_SALE)
 
     def get_listings_data(self) -> list[dict[str, Any]]:
-        return self.get_data_of_houses_for_sale() \
-            + self.get_data_of_houses_for_rent() \
-            + self.get_data_of_apartments_for_rent() \
-            + self.get_data_of_apartments_for_sale()
+        return list(self.iter_listings())
+
+    def categories(self) -> tuple[Endpoints, ...]:
+        """The categories, in the order they are crawled."""
+        return (self.Endpoints.HOUSE_SALE,
+                self.Endpoints.HOUSE_RENTAL,
+                self.Endpoints.APARTMENTS_RENTAL,
+                self.Endpoints.APARTMENTS_SALE)
+
+    def iter_listings(self) -> Iterator[dict[str, Any]]:
+        """Yields the data of the listings of every category as soon as they are extracted.
+
+        :returns: The iterator over the data of the listings
+        """
+        for category in self.categories():
+            yield from self.iter_listings_of_category(category)
+
+    def iter_data_frames(self,
+                         chunk_size: int = 100,
+                         category: Optional[Endpoints] = None,
+                         keep_checkpoint: bool = False) -> Iterator[DataFrame]:
+        """Yields the listings as :class:`DataFrame` of at most ``chunk_size`` rows, as they are extracted.
+
+        :param chunk_size: The maximum number of listings per :class:`DataFrame`.
+        :param category: An optional category to restrict the listings to.
+        :param keep_checkpoint: Whether the checkpoint of the category is left to the caller, see :meth:`iter_listings_of_category`.
+        :returns: The iterator over the :class:`DataFrame`
+        """
+        infos: Iterator[dict[str, Any]] = self.iter_listings() if category is None \
+            else self.iter_listings_of_category(category, keep_checkpoint)
+
+        return self.chunk_data_frames(infos, chunk_size)
+
+    def iter_archived_listings(self) -> Iterator[dict[str, Any]]:
+        """Extracts again the last fetch of every archived listing of the site, without loading any page.
+
+        The date of each listing is the one of its fetch, not of the extraction.
+
+        :raises ValueError: If the scrapper has no archive.
+        :returns: The iterator over the data of the listings
+        """
+        archive: Optional[HtmlArchive] = self.archive
+
+        if archive is None:
+            raise ValueError("There is no archive to read the listings from !")
+
+        categories: dict[tuple[str, str], list[ArchiveEntry]] = {}
+
+        for entry in archive.entries(PageType.LISTING, self.url):
+            if entry.listing_type is not None and entry.rent_or_sale is not None:
+                categories.setdefault((entry.listing_type, entry.rent_or_sale), []).append(entry)
+
+        for (listing_type, rent_or_sale), entries in categories.items():
+            parse = ListingParser(self.SoupExtractor.get_listing_data, listing_type, rent_or_sale)
+
+            results = self.pipeline.run(lambda _, url: self.load_archived(archive, url), parse,
+                                        [entry.url for entry in entries])
+
+            for entry, data in zip(entries, results):  # the results are in the order of the urls
+                if data is not None:
+                    data['date'] = datetime.fromisoformat(entry.fetched_at).strftime('%Y-%m-%d %H:%M:%S')
+                    yield data
+
+    def chunk_data_frames(self, infos: Iterable[dict[str, Any]], chunk_size: int = 100) -> Iterator[DataFrame]:
+        """Groups extracted listings into :class:`DataFrame` of at most ``chunk_size`` rows.
+
+        :param infos: The listings, as returned by :meth:`get_listing`.
+        :param chunk_size: The maximum number of listings per :class:`DataFrame`.
+        :returns: The iterator over the :class:`DataFrame`
+        """
+        chunk: list[dict[str, Any]] = []
+
+        for info in infos:
+            chunk.append(info)
+
+            if len(chunk) >= chunk_size:
+                yield self.convert(chunk)
+                chunk = []
+
+        if chunk:
+            yield self.convert(chunk)
+
+    def convert(self, infos: list[dict[str, Any]]) -> DataFrame:
+        """Transforms extracted listings into a :class:`DataFrame`, timed in the metrics.
+
+        :param infos: The listings, as returned by :meth:`get_listing`.
+        :returns: The :class:`DataFrame`
+        """
+        with self.stage('convert'):
+            return self.records_to_data_frame(infos)
 
     def to_data_frame(self) -> DataFrame:
         """Transforms the gathered data into a pandas :class:`DataFrame`.
 
+        :returns: The :class:`DataFrame`
+        """
+        chunks: list[DataFrame] = list(self.iter_data_frames())
+
+        if not chunks:
+            return self.records_to_data_frame([])
+
+        return pd.concat(chunks, ignore_index=True)
+
+    def save_data(self, writer: ListingWriter, chunk_size: int = 100) -> None:
+        """Gives the listings to a writer as they are extracted, in chunks.
+
+        With checkpoints, the writer is flushed after each chunk before the listings are recorded as done,
+        and the checkpoint of a category is deleted once it has been fully crawled. The listings flushed but not
+        recorded before an interruption are found in the processed links on resume (see :meth:`checkpoint`).
+
+        :param writer: The writer to save the listings with.
+        :param chunk_size: The maximum number of listings converted and written at once.
+        """
+        for category in self.categories():
+            checkpoint: Optional[CrawlCheckpoint] = self.checkpoint(category)
+
+            for df in self.iter_data_frames(chunk_size, category, keep_checkpoint=True):
+                with self.stage('write'):
+                    writer.write(df)
+
+                    if checkpoint is not None:
+                        writer.flush()
+
+                if checkpoint is not None:
+                    checkpoint.complete(df['links'])
+
+            with self.stage('write'):
+                writer.flush()
+
+            if checkpoint is not None and checkpoint.finished:
+                self.clear_checkpoint(category)
+
+    def checkpoint(self, category: Endpoints) -> Optional[CrawlCheckpoint]:
+        """Gets the checkpoint of a category, loading it on first use.
+
+        The processed links are expected to hold the saved listings, like the links of the history in main.py.
+        The endpoints of a loaded checkpoint already among them were written before an interruption stopped the
+        crawl from recording them, so they are recorded as done instead of being written twice.
+
+        :param category: The category.
+        :return: The checkpoint, ``None`` if the checkpoints are disabled.
+        """
+        if self.checkpoint_dir is None:
+            return None
+
+        if category.name not in self._checkpoints:
+            checkpoint = CrawlCheckpoint(self.checkpoint_dir, parse.urlsplit(self.url).netloc, category.name)
+
+            # the endpoints were new when harvested, the processed ones were written before an interruption
+            checkpoint.complete(f"{self.url}{endpoint}" for endpoint in checkpoint.endpoints
+                                if self.is_processed(endpoint))
+
+            self._checkpoints[category.name] = checkpoint
+
+        return self._checkpoints[category.name]
+
+    def clear_checkpoint(self, category: Endpoints) -> None:
+        """Deletes the checkpoint of a category, once it has been fully crawled.
+
+        :param category: The category.
+        """
+        checkpoint: Optional[CrawlCheckpoint] = self._checkpoints.pop(category.name, None)
+
+        if checkpoint is not None:
+            checkpoint.clear()
+
+    def labels(self, **labels: str) -> dict[str, str]:
+        """The labels of the metrics of the scrapper.
+
+        :param labels: Additional labels.
+        :return: The site, the current category and the additional labels.
+        """
+        return {'site': parse.urlsplit(self.url).netloc, 'category': self.current_category} | labels
+
+    def stage(self, name: str, **labels: str) -> ContextManager[None]:
+        """Times a stage of the crawl in the metrics.
+
+        :param name: The name of the stage.
+        :param labels: Additional labels.
+        :return: The context manager timing its block.
+        """
+        return self.metrics.time('stage_seconds', **self.labels(stage=name, **labels))
+
+    def count(self, name: str, **labels: str) -> None:
+        """Counts an event of the crawl in the metrics.
+
+        :param name: The name of the counter.
+        :param labels: Additional labels.
+        """
+        self.metrics.increment(name, **self.labels(**labels))
+
+    @staticmethod
+    def records_to_data_frame(infos: list[dict[str, Any]]) -> DataFrame:
+        """Transforms extracted listings into a pandas :class:`DataFrame`.
+
+        The prices are converted to dollars and the prices per meter computed on the whole columns at once.
+
+        :param infos: The listings, as returned by :meth:`get_listing`.
         :returns: The :class:`DataFrame`
         """
         pre_data_frame: dict[str, list[Any]] = {
             'id': [],
-            'price': [],
+            'raw_price': [],
+            'currency': [],
             'rooms': [],
             'square_meters': [],
             'address': [],
@@ -259,12 +985,9 @@ class ListingScrapperBase(Protocol):
             'links': [],
             'SHAPE': [],
 
-            # 'Currency': [],
             'type': []
         }
 
-        infos: list[dict[str, Any]] = self.get_listings_data()
-
         for info in infos:
             if pre_data_frame.keys() != info.keys():
                 print(list(pre_data_frame.keys()), list(info.keys()))
@@ -273,7 +996,7 @@ class ListingScrapperBase(Protocol):
             for k, v in info.items():
                 pre_data_frame[k].append(v)
 
-        return DataFrame(pre_data_frame)
+        return normalize_prices(DataFrame(pre_data_frame))[COLUMNS]
 
     def save_data_to_tsv(self, path: str) -> None:
         self.to_data_frame().to_csv(path, sep='\t', index=False)
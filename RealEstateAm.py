@@ -1,27 +1,47 @@
 from utils import extract_first_numbers, extract_numbers
 from ListingScrapperBase import ListingScrapperBase
-
+from driver_pool import DriverPool
+from pipeline import ListingPipeline
+from archive import HtmlArchive
+from metrics import Metrics
+from browser import COMMON_BLOCKED_URLS, STYLESHEETS, BrowserProfile
+from fetchers import NoListingsError, PageType
+from parsers import make_soup
+from field_specs import FieldExtractor, FieldSpec, Selector, grandparent
+
+import json
+import re
 from datetime import datetime
 
 from enum import Enum
-from typing import Any, Optional, override
+from typing import Any, Final, Iterable, Optional, override
 
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
 
-from bs4 import BeautifulSoup, NavigableString, ResultSet, Tag
+from bs4 import NavigableString, SoupStrainer, Tag
 from urllib import parse
 
-from rich import print
-
 REAL_ESTATE_AM = r"https://www.real-estate.am/en/"
+DISPLAYED_CURRENCY = "USD"  # the prices on the site are shown in dollars
+
+# the fields of a listing, when the state has all of them the DOM isn't built
+NEXT_DATA_FIELDS: Final[frozenset[str]] = frozenset({
+    'raw_price', 'currency', 'address', 'SHAPE', 'price_per_meter', 'square_meters', 'building_floors', 'floor',
+    'furniture', 'height', 'renovation', 'rooms', 'bathroom'})
+NEXT_DATA = re.compile(r'<script id="__NEXT_DATA__" type="application/json"[^>]*>(.*?)</script>', re.DOTALL)
 
 
 class RealEstateAm(ListingScrapperBase):
     """The scrapper designed for real-estate.am"""
 
+    http_pages = frozenset({PageType.GALLERY})  # the gallery is server side rendered by next.js
+    use_next_data: bool = False  # the paths of the next.js state are unconfirmed until a real page is captured
+    gallery_page_link = re.compile(r'[?&;]page=(\d+)')  # `&amp;page=` in the attributes
+    blocked_urls = COMMON_BLOCKED_URLS + STYLESHEETS  # only the script of the map is waited for
+    map_data_selector = 'script[charset="utf-8"][src*="https://api-maps.yandex.ru/services/coverage/v2/"][src*="ll="]'
+
     @override
     class Endpoints(Enum):
 
@@ -41,133 +61,240 @@ class RealEstateAm(ListingScrapperBase):
     class XPaths(Enum):
 
         FIRST_LISTING_OF_PAGE = '//*[@id="__next"]/div[1]/div[1]/div[2]/div/div[3]/div[1]/div/div[1]/a/div/div[2]'
-        MAP_USER_AGREEMENT = '//*[@id="property-details-container"]/div/div[2]/div[2]/div/div/div[1]/ymaps/ymaps/ymaps/ymaps[3]/ymaps[2]/ymaps/ymaps[2]/ymaps/ymaps[1]/ymaps/ymaps[2]/a'
-        MAP_USER_AGREEMENT_ALT = '//*[@id="property-details-container"]/div/div[2]/div/div/div/div[1]/ymaps/ymaps/ymaps/ymaps[3]/ymaps[2]/ymaps/ymaps[2]/ymaps/ymaps[1]/ymaps/ymaps[2]/a'
 
-    @override
-    class SoupFinder:
+    class NextDataPaths(Enum):
+        """The paths of the fields in the ``__NEXT_DATA__`` state, the first one found is used.
+
+            They aren't taken from a real page yet, so :attr:`RealEstateAm.use_next_data` is off.
+        """
+
+        LISTING = (('props', 'pageProps', 'property'), ('props', 'pageProps', 'propertyDetails'),
+                   ('props', 'pageProps', 'data', 'property'))
+        PRICE = (('price', 'amount'), ('price',), ('priceUsd',))
+        PRICE_PER_SQUARE_METER = (('pricePerSquareMeter',), ('price', 'perSquareMeter'))
+        CURRENCY = (('price', 'currency'), ('currency',))
+        ADDRESS = (('address', 'fullAddress'), ('fullAddress',), ('address',))
+        LATITUDE = (('location', 'lat'), ('location', 'latitude'), ('latitude',), ('lat',))
+        LONGITUDE = (('location', 'lng'), ('location', 'longitude'), ('longitude',), ('lng',))
+        AREA = (('area',), ('totalArea',), ('squareMeters',))
+        FLOOR = (('floor',),)
+        BUILDING_FLOORS = (('buildingFloors',), ('floors',), ('totalFloors',))
+        HEIGHT = (('ceilingHeight',), ('height',))
+        ROOMS = (('rooms',), ('roomsCount',), ('numberOfRooms',))
+        BATHROOMS = (('bathrooms',), ('bathroomsCount',), ('numberOfBathrooms',))
+        RENOVATION = (('renovation',), ('renovationType',), ('condition',))
+        AMENITIES = (('amenities',), ('utilities',), ('facilities',))
+
+    class NextData:
+        """This is a helper class to read the state next.js embeds in the pages as json.
+
+            It is a lot cheaper than building the whole DOM, the :class:`SoupFinder` is used when it isn't there.
+        """
 
         @staticmethod
-        def address(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('div', class_='PropertyTitleAndaddress_address_info__Ee_vF')
+        def load(html: str) -> Optional[dict[str, Any]]:
+            """Loads the ``__NEXT_DATA__`` state of a page.
 
-        @staticmethod
-        def price(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('div', class_='Propertyprice_container__6_MBs PropertyDetails_price__mJO7i')
+            :param html: The html string of the page.
+            :return: The state, ``None`` if the page doesn't have a valid one.
+            """
+            match = NEXT_DATA.search(html)
 
-        @staticmethod
-        def price_per_square_meter(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            return soup.find('div', class_='PropertyDetails_price_detailed_info___mHSJ')
+            if match is None:
+                return None
 
-        @staticmethod
-        def amenities(soup: BeautifulSoup) -> ResultSet:
-            return soup.find_all('div', class_='PropertyDetails_utility__8RVQg')
+            try:
+                state = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                return None
+
+            return state if isinstance(state, dict) else None
 
         @staticmethod
-        def area(soup: BeautifulSoup) -> Optional[Tag]:
-            element = soup.find('g', {'clip-path': "url(#clip0_1653_45530)"})
+        def find(data: Any, paths: 'RealEstateAm.NextDataPaths') -> Any:
+            """Finds the first non-empty value at one of the paths.
 
-            if element is None:
-                return None
+            :param data: The json object to look into.
+            :param paths: The candidate paths.
+            :return: The value, ``None`` if none of the paths lead to one.
+            """
+            for path in paths.value:
+                value = data
 
-            element_parent = element.parent
+                for key in path:
+                    if not isinstance(value, dict) or key not in value:
+                        value = None
+                        break
+                    value = value[key]
 
-            if element_parent is None:
-                return None
+                if value not in (None, "", [], {}):
+                    return value
 
-            return element_parent.parent
+            return None
 
         @staticmethod
-        def floors(soup: BeautifulSoup) -> Optional[Tag]:
+        def links(data: Any) -> list[str]:
+            """Collects the links to listings anywhere in the state, in order and without duplicates.
 
-            element = soup.find('path', d=RealEstateAm.SVGS.FLOORS.value)
-            if element is None:
-                return None
+            :param data: The json object to look into.
+            :return: The links.
+            """
+            links: dict[str, None] = {}
+            stack: list[Any] = [data]
 
-            element_parent = element.parent
+            while stack:
+                value = stack.pop()
 
-            if element_parent is None:
-                return None
+                if isinstance(value, dict):
+                    stack.extend(reversed(list(value.values())))
+                elif isinstance(value, list):
+                    stack.extend(reversed(value))
+                elif isinstance(value, str) and RealEstateAm.is_listing_link(value):
+                    links[value] = None
+
+            return list(links)
 
-            return element_parent.parent
+    class NextDataExtractor:
+        """The helper class to extract the data of a listing from its next.js state."""
 
         @staticmethod
-        def height(soup: BeautifulSoup) -> Optional[Tag]:
+        def number(value: Any) -> float | str:
+            if isinstance(value, bool) or value is None:
+                return ""
 
-            element = soup.find('path', d=RealEstateAm.SVGS.HEIGHT.value)
-            if element is None:
-                return None
+            if isinstance(value, (int, float)):
+                return float(value)
 
-            element_parent = element.parent
+            return extract_first_numbers(str(value))
 
-            if element_parent is None:
-                return None
+        @staticmethod
+        def text(value: Any) -> str:
+            if value is None:
+                return ""
+
+            if isinstance(value, dict):  # translated or labelled values
+                value = value.get('en') or value.get('name') or value.get('label') or value.get('value') or ""
+
+            return str(value)
 
-            return element_parent.parent
+        @staticmethod
+        def furniture(amenities: Any) -> bool | str:
+            if not isinstance(amenities, list):
+                return ""
+
+            return any('furniture' in RealEstateAm.NextDataExtractor.text(amenity).lower() for amenity in amenities)
 
         @staticmethod
-        def bathrooms(soup: BeautifulSoup) -> Optional[Tag]:
+        def get_listing_data(html: str) -> Optional[dict[str, Any]]:
+            """Extracts the fields of a listing found in the next.js state of its page.
 
-            element = soup.find('g', {'clip-path': "url(#clip0_1653_45537)"})
+            Only the fields whose path is in the state are returned, the others are left to the DOM.
 
-            if element is None:
+            :param html: The html string of the listing.
+            :return: The fields found, with the keys of :meth:`SoupExtractor.get_listing_data`,
+                ``None`` if the page doesn't have a state of the listing.
+            """
+            state: Optional[dict[str, Any]] = RealEstateAm.NextData.load(html)
+
+            if state is None:
                 return None
 
-            element_parent = element.parent
+            find = RealEstateAm.NextData.find
+            paths = RealEstateAm.NextDataPaths
+            extractor = RealEstateAm.NextDataExtractor
+
+            listing: Any = find(state, paths.LISTING)
 
-            if element_parent is None:
+            if not isinstance(listing, dict):
                 return None
 
-            return element_parent.parent
+            data: dict[str, Any] = {}
 
-        @staticmethod
-        def rooms(soup: BeautifulSoup) -> Optional[Tag]:
+            price: Any = find(listing, paths.PRICE)
+            currency: Any = find(listing, paths.CURRENCY)
 
-            element = soup.find('g', {'clip-path': "url(#clip0_1653_45506)"})
+            if price is not None and not isinstance(price, dict) and currency is not None:  # a price needs its currency
+                data["raw_price"] = ''.join(extract_numbers(str(price)))
+                data["currency"] = extractor.text(currency)
 
-            if element is None:
-                return None
+            latitude: Any = find(listing, paths.LATITUDE)
+            longitude: Any = find(listing, paths.LONGITUDE)
 
-            element_parent = element.parent
+            if latitude is not None and longitude is not None:
+                data["SHAPE"] = {
+                    "x": str(longitude),
+                    "y": str(latitude),
+                    'spatialReference': {'wkid': 4326, 'latestWkid': 4326}
+                }
 
-            if element_parent is None:
-                return None
+            floor: Any = find(listing, paths.FLOOR)
+            building_floors: Any = find(listing, paths.BUILDING_FLOORS)
 
-            return element_parent.parent
+            if building_floors is not None:
+                data["building_floors"] = extractor.number(building_floors)
+                data["floor"] = extractor.number(floor) if floor is not None else ""
+            elif floor is not None:  # a house only has a number of floors
+                data["building_floors"] = extractor.number(floor)
+                data["floor"] = ""
 
-        @staticmethod
-        def renovation(soup: BeautifulSoup) -> Optional[Tag]:
+            if (amenities := find(listing, paths.AMENITIES)) is not None:
+                data["furniture"] = extractor.furniture(amenities)
 
-            element = soup.find('g', {'clip-path': "url(#clip0_195_10157)"})
+            if (address := find(listing, paths.ADDRESS)) is not None:
+                data["address"] = extractor.text(address)
 
-            if element is None:
-                return None
+            if (renovation := find(listing, paths.RENOVATION)) is not None:
+                data["renovation"] = extractor.text(renovation)
 
-            element_parent = element.parent
+            if (price_per_meter := find(listing, paths.PRICE_PER_SQUARE_METER)) is not None:
+                data["price_per_meter"] = ''.join(extract_numbers(str(price_per_meter)))
 
-            if element_parent is None:
-                return None
+            numbers: dict[str, RealEstateAm.NextDataPaths] = {
+                "square_meters": paths.AREA,
+                "height": paths.HEIGHT,
+                "rooms": paths.ROOMS,
+                "bathroom": paths.BATHROOMS,
+            }
 
-            return element_parent.parent
+            for key, path in numbers.items():
+                if (value := find(listing, path)) is not None:
+                    data[key] = extractor.number(value)
 
-        @staticmethod
-        def coordinates(soup: BeautifulSoup) -> Optional[Tag | NavigableString]:
-            scripts = soup.find_all('script', charset="utf-8", src=True)
-            for script in scripts:
-                if 'https://api-maps.yandex.ru/services/coverage/v2/' not in script['src']:
-                    continue
+            return data
 
-                return script
+    @override
+    class SoupFinder:
+
+        address = FieldSpec('address', Selector('div', class_='PropertyTitleAndaddress_address_info__Ee_vF'))
+        price = FieldSpec('price', Selector('div', class_='Propertyprice_container__6_MBs PropertyDetails_price__mJO7i'))
+        price_per_square_meter = FieldSpec('price_per_square_meter',
+                                           Selector('div', class_='PropertyDetails_price_detailed_info___mHSJ'))
+        amenities = FieldSpec('amenities', Selector('div', class_='PropertyDetails_utility__8RVQg'), many=True)
+
+        # the values are next to svg icons, we find the icon and go up to the container of the value
+        area = FieldSpec('area', Selector('g', attrs={'clip-path': "url(#clip0_1653_45530)"}), grandparent)
+        floors = FieldSpec('floors', Selector(
+            'path', attrs={'d': True}, predicate=lambda path: path['d'] == RealEstateAm.SVGS.FLOORS.value), grandparent)
+        height = FieldSpec('height', Selector(
+            'path', attrs={'d': True}, predicate=lambda path: path['d'] == RealEstateAm.SVGS.HEIGHT.value), grandparent)
+        bathrooms = FieldSpec('bathrooms', Selector('g', attrs={'clip-path': "url(#clip0_1653_45537)"}), grandparent)
+        rooms = FieldSpec('rooms', Selector('g', attrs={'clip-path': "url(#clip0_1653_45506)"}), grandparent)
+        renovation = FieldSpec('renovation', Selector('g', attrs={'clip-path': "url(#clip0_195_10157)"}), grandparent)
+
+        coordinates = FieldSpec('coordinates', Selector(
+            'script', attrs={'charset': 'utf-8', 'src': True},
+            predicate=lambda script: 'https://api-maps.yandex.ru/services/coverage/v2/' in script['src']))
 
-            raise AssertionError("Shouldn't be reachable! (could not find map element on page)")
+        FIELDS = FieldExtractor([address, price, price_per_square_meter, amenities, area, floors, height, bathrooms,
+                                 rooms, renovation, coordinates])
+
+        gallery_strainer = SoupStrainer('a', href=True)
 
     @override
     class SoupExtractor:
 
         @staticmethod
-        def price(soup: BeautifulSoup) -> str:
-
-            price: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.price(soup)
+        def price(price: Optional[Tag | NavigableString]) -> str:
 
             if price is None:
                 return ""
@@ -178,9 +305,7 @@ class RealEstateAm(ListingScrapperBase):
             return ''.join(extract_numbers(price.text))
 
         @staticmethod
-        def coordinates(soup: BeautifulSoup) -> str:
-
-            coordinates: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.coordinates(soup)
+        def coordinates(coordinates: Optional[Tag | NavigableString]) -> str:
 
             if coordinates is None:
                 return ""
@@ -202,9 +327,7 @@ class RealEstateAm(ListingScrapperBase):
             return ""
 
         @staticmethod
-        def address(soup: BeautifulSoup) -> str:
-
-            address_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.address(soup)
+        def address(address_parent: Optional[Tag | NavigableString]) -> str:
 
             if address_parent is None:
                 return ""
@@ -220,8 +343,7 @@ class RealEstateAm(ListingScrapperBase):
             return address.text
 
         @staticmethod
-        def price_per_square_meter(soup: BeautifulSoup) -> str:
-            price_per_square_meter: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.price_per_square_meter(soup)
+        def price_per_square_meter(price_per_square_meter: Optional[Tag | NavigableString]) -> str:
 
             if price_per_square_meter is None:
                 return ""
@@ -232,9 +354,7 @@ class RealEstateAm(ListingScrapperBase):
             return ''.join(extract_numbers(price_per_square_meter.text))
 
         @staticmethod
-        def area(soup: BeautifulSoup) -> float | str:
-
-            area_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.area(soup)
+        def area(area_parent: Optional[Tag | NavigableString]) -> float | str:
 
             if area_parent is None:
                 return ""
@@ -250,9 +370,7 @@ class RealEstateAm(ListingScrapperBase):
             return extract_first_numbers(area.text)
 
         @staticmethod
-        def height(soup: BeautifulSoup) -> float | str:
-
-            height_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.height(soup)
+        def height(height_parent: Optional[Tag | NavigableString]) -> float | str:
 
             if height_parent is None:
                 return ""
@@ -268,9 +386,7 @@ class RealEstateAm(ListingScrapperBase):
             return extract_first_numbers(height.text)
 
         @staticmethod
-        def bathrooms(soup: BeautifulSoup) -> float | str:
-
-            bathrooms_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.bathrooms(soup)
+        def bathrooms(bathrooms_parent: Optional[Tag | NavigableString]) -> float | str:
 
             if bathrooms_parent is None:
                 return ""
@@ -286,9 +402,7 @@ class RealEstateAm(ListingScrapperBase):
             return extract_first_numbers(bathrooms.text)
 
         @staticmethod
-        def rooms(soup: BeautifulSoup) -> float | str:
-
-            rooms_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.rooms(soup)
+        def rooms(rooms_parent: Optional[Tag | NavigableString]) -> float | str:
 
             if rooms_parent is None:
                 return ""
@@ -304,9 +418,7 @@ class RealEstateAm(ListingScrapperBase):
             return extract_first_numbers(rooms.text)
 
         @staticmethod
-        def floor(soup: BeautifulSoup) -> float | str:
-
-            floor_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.floors(soup)
+        def floor(floor_parent: Optional[Tag | NavigableString]) -> float | str:
 
             if floor_parent is None:
                 return ""
@@ -325,9 +437,7 @@ class RealEstateAm(ListingScrapperBase):
             return extract_first_numbers(floor.text)
 
         @staticmethod
-        def building_floors(soup: BeautifulSoup) -> float | str:
-
-            floor_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.floors(soup)
+        def building_floors(floor_parent: Optional[Tag | NavigableString]) -> float | str:
 
             if floor_parent is None:
                 return ""
@@ -346,9 +456,7 @@ class RealEstateAm(ListingScrapperBase):
             return extract_numbers(floor.text)[1]
 
         @staticmethod
-        def renovation(soup: BeautifulSoup) -> str:
-
-            renovation_parent: Optional[Tag | NavigableString] = RealEstateAm.SoupFinder.renovation(soup)
+        def renovation(renovation_parent: Optional[Tag | NavigableString]) -> str:
 
             if renovation_parent is None:
                 return ""
@@ -364,8 +472,7 @@ class RealEstateAm(ListingScrapperBase):
             return renovation.text
 
         @staticmethod
-        def furniture(soup: BeautifulSoup) -> bool | str:
-            amenities: ResultSet = RealEstateAm.SoupFinder.amenities(soup)
+        def furniture(amenities: list[Tag]) -> bool | str:
 
             if amenities is None:
                 return ""
@@ -378,11 +485,28 @@ class RealEstateAm(ListingScrapperBase):
 
         # @override
         @staticmethod
-        def get_listing_data(html: str, url: str) -> dict[str, Any]:
+        def get_listing_data(html: str, url: str, rent_or_sale: Optional[str] = None) -> dict[str, Any]:
+
+            next_data: dict[str, Any] = {}
+
+            if RealEstateAm.use_next_data:
+                next_data = RealEstateAm.NextDataExtractor.get_listing_data(html) or {}
+
+            data: dict[str, Any] = {
+                "id": url[-7:][:-1],
+                "links": url,
+                "source": REAL_ESTATE_AM,
+                "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
 
-            soup = BeautifulSoup(html, 'html.parser')
+            if NEXT_DATA_FIELDS <= next_data.keys():  # no need for the DOM
+                return data | next_data
 
-            coordinates: str = RealEstateAm.SoupExtractor.coordinates(soup)
+            soup = make_soup(html, RealEstateAm.parser)
+
+            found: dict[str, Any] = RealEstateAm.SoupFinder.FIELDS.extract(soup)
+
+            coordinates: str = RealEstateAm.SoupExtractor.coordinates(found['coordinates'])
 
             x_coord: str = "0"
             y_coord: str = "0"
@@ -393,73 +517,79 @@ class RealEstateAm(ListingScrapperBase):
                 x_coord = coordinates_list[0]
                 y_coord = coordinates_list[1]
 
-            data: dict[str, Any] = {
-                "id": url[-7:][:-1],
-                "links": url,
-                "source": REAL_ESTATE_AM,
-                "price": RealEstateAm.SoupExtractor.price(soup),
-                "address": RealEstateAm.SoupExtractor.address(soup),
-                "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            data |= {
+                "raw_price": RealEstateAm.SoupExtractor.price(found['price']),
+                "currency": DISPLAYED_CURRENCY,
+                "address": RealEstateAm.SoupExtractor.address(found['address']),
                 "SHAPE": {
                     "x": x_coord,
                     "y": y_coord,
                     'spatialReference': {'wkid': 4326, 'latestWkid': 4326}
                 },
-                "price_per_meter": RealEstateAm.SoupExtractor.price_per_square_meter(soup),
-                "square_meters": RealEstateAm.SoupExtractor.area(soup),
-                "building_floors": RealEstateAm.SoupExtractor.building_floors(soup),
-                "floor": RealEstateAm.SoupExtractor.floor(soup),
-                "furniture": RealEstateAm.SoupExtractor.furniture(soup),
-                "height": RealEstateAm.SoupExtractor.height(soup),
-                "renovation": RealEstateAm.SoupExtractor.renovation(soup),
-                "rooms": RealEstateAm.SoupExtractor.rooms(soup),
-                "bathroom": RealEstateAm.SoupExtractor.bathrooms(soup),
+                "price_per_meter": RealEstateAm.SoupExtractor.price_per_square_meter(found['price_per_square_meter']),
+                "square_meters": RealEstateAm.SoupExtractor.area(found['area']),
+                "building_floors": RealEstateAm.SoupExtractor.building_floors(found['floors']),
+                "floor": RealEstateAm.SoupExtractor.floor(found['floors']),
+                "furniture": RealEstateAm.SoupExtractor.furniture(found['amenities']),
+                "height": RealEstateAm.SoupExtractor.height(found['height']),
+                "renovation": RealEstateAm.SoupExtractor.renovation(found['renovation']),
+                "rooms": RealEstateAm.SoupExtractor.rooms(found['rooms']),
+                "bathroom": RealEstateAm.SoupExtractor.bathrooms(found['bathrooms']),
             }
 
-            if not data['price_per_meter'] and data['price'] and data['square_meters']:
-                data['price_per_meter'] = float(data['price']) / float(data['square_meters'])
-
-            return data
-
-    def __init__(self, webdriver: WebDriver, limit_per_category: Optional[int] = None, processed: Optional[list[str]] = None) -> None:
-        super().__init__(webdriver, url=REAL_ESTATE_AM, limit_per_category=limit_per_category, processed=processed)
+            # the DOM is trusted over the state, which only fills the fields the DOM left empty
+            return data | {key: value for key, value in next_data.items() if data.get(key) in (None, '')}
+
+    def __init__(self,
+                 webdriver: WebDriver,
+                 limit_per_category: Optional[int] = None,
+                 processed: Optional[Iterable[str]] = None,
+                 driver_pool: Optional[DriverPool] = None,
+                 checkpoint_dir: Optional[str] = None,
+                 stop_after_known_pages: Optional[int] = None,
+                 pipeline: Optional[ListingPipeline] = None,
+                 archive: Optional[HtmlArchive] = None,
+                 metrics: Optional[Metrics] = None,
+                 browser_profile: Optional[BrowserProfile] = None,
+                 url: str = REAL_ESTATE_AM) -> None:
+        super().__init__(webdriver, url=url, limit_per_category=limit_per_category, processed=processed,
+                         driver_pool=driver_pool, checkpoint_dir=checkpoint_dir,
+                         stop_after_known_pages=stop_after_known_pages, pipeline=pipeline,
+                         archive=archive, metrics=metrics, browser_profile=browser_profile)
+
+    @staticmethod
+    def is_listing_link(href: str) -> bool:
+        """Checks if a link of the site leads to a listing.
+
+        :param href: The link.
+        :return: Whether it is the link of a listing.
+        """
+        return href.startswith('/en/') and ('/buy' in href or '/for-rent' in href)
 
     @override
-    def get_listings_links_from_gallery(self, url: str) -> list[str]:
+    def gallery_links(self, html: str, url: str) -> list[str]:
 
-        self.webdriver.get(url)
-        self.wait.until(ec.url_to_be(url))
-        self.wait.until(ec.element_to_be_clickable((By.XPATH, self.XPaths.FIRST_LISTING_OF_PAGE.value)))
-
-        soup = BeautifulSoup(self.webdriver.page_source, 'html.parser')
+        listings_links: list[str] = []
 
-        listings_links: ResultSet[Tag] = soup.find_all('a', href=True)
+        if self.use_next_data and (state := self.NextData.load(html)) is not None:
+            listings_links = self.NextData.links(state)
 
-        endpoints: list[str] = []
+        if not listings_links:
+            soup = make_soup(html, self.parser, parse_only=self.SoupFinder.gallery_strainer)
+            listings_links = [link['href'] for link in soup.find_all('a', href=True) if self.is_listing_link(link['href'])]
 
-        for link in listings_links:
-            if ('/en/' not in link['href']
-                    or ('/buy' not in link['href'] and '/for-rent' not in link['href'])):
-                continue
-            endpoints.append(f"{link['href']}"[4:])  # we take out the `/en/`
+        if not listings_links:
+            raise NoListingsError(f"No listings on {url}")
 
-            if self.limit_per_category and len(endpoints) >= self.limit_per_category:
-                return endpoints
+        return [f"{link}"[4:] for link in listings_links]  # we take out the `/en/`
 
-        return endpoints
+    @override
+    def wait_for_gallery(self) -> None:
+        self.wait.until(ec.element_to_be_clickable((By.XPATH, self.XPaths.FIRST_LISTING_OF_PAGE.value)))
 
     @override
     def open_map(self) -> bool:
-        try:
-            self.wait.until(ec.element_to_be_clickable((By.XPATH, self.XPaths.MAP_USER_AGREEMENT.value)))
-            return True
-        except TimeoutException:
-            try:
-                self.wait.until(ec.element_to_be_clickable((By.XPATH, self.XPaths.MAP_USER_AGREEMENT_ALT.value)))
-                return True
-            except TimeoutException:
-                print("Map couldn't open!")
-                return False
+        return self.wait_for_map_data()
 
     @override
     def set_page(self, page: int) -> None:
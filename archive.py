@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from threading import Lock, get_ident
+from typing import Iterator, Optional
+
+from rich import print
+
+from fetchers import PageLoadError, PageType
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """A fetch of a page, as recorded in the index of a :class:`HtmlArchive`."""
+    url: str
+    fetched_at: str  # iso format
+    digest: str  # sha256 of the html
+    page_type: str
+    listing_type: Optional[str] = None
+    rent_or_sale: Optional[str] = None
+
+
+class HtmlArchive:
+    """A compressed archive of the fetched pages, so they can be parsed again without crawling the sites.
+
+    The html is stored gzipped under its sha256, so a page that didn't change between two crawls is only stored once.
+    Each fetch is appended to ``index.jsonl`` with its url and time.
+
+    In replay mode, the scrappers read the pages from the archive instead of loading them.
+
+    :param root: The directory of the archive.
+    :param replay: Whether the pages are read from the archive instead of fetched.
+    :param as_of: In replay mode, the pages are replayed as they were at this time, defaults to the latest fetch.
+    """
+    root: Path
+    replay: bool
+    as_of: Optional[datetime]
+
+    def __init__(self, root: str, replay: bool = False, as_of: Optional[datetime] = None) -> None:
+        self.root = Path(root)
+        self.replay = replay
+        self.as_of = as_of
+        self._lock = Lock()
+        self._index: dict[str, list[ArchiveEntry]] = {}
+
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+
+        self._load()
+
+    @property
+    def index_path(self) -> Path:
+        """The log of the fetches."""
+        return self.root / 'index.jsonl'
+
+    def _load(self) -> None:
+        if not self.index_path.exists():
+            return
+
+        with self.index_path.open(encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = ArchiveEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    print(f"Ignoring a corrupted line of {self.index_path}!")
+                    continue
+
+                self._index.setdefault(entry.url, []).append(entry)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest[:2] / f"{digest[2:]}.html.gz"
+
+    def save(self,
+             url: str,
+             html: str,
+             page_type: PageType,
+             listing_type: Optional[str] = None,
+             rent_or_sale: Optional[str] = None) -> ArchiveEntry:
+        """Archives a fetched page.
+
+        :param url: The url of the page.
+        :param html: The html of the page.
+        :param page_type: The kind of page.
+        :param listing_type: The type of the listing (appartments or houses), for the listings pages.
+        :param rent_or_sale: Whether the listing is for rent or for sale, for the listings pages.
+        :return: The entry of the fetch.
+        """
+        data: bytes = html.encode('utf-8')
+        digest: str = hashlib.sha256(data).hexdigest()
+        path: Path = self._object_path(digest)
+
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            temporary: Path = path.with_suffix(f'.{get_ident()}.tmp')  # two threads can save the same page
+            temporary.write_bytes(gzip.compress(data))
+            temporary.replace(path)
+
+        entry = ArchiveEntry(url, datetime.now().isoformat(), digest, page_type.value, listing_type, rent_or_sale)
+
+        with self._lock:
+            with self.index_path.open('a', encoding='utf-8') as file:
+                file.write(json.dumps(asdict(entry)) + '\n')
+
+            self._index.setdefault(url, []).append(entry)
+
+        return entry
+
+    def read(self, entry: ArchiveEntry) -> str:
+        """Reads the html of an archived page.
+
+        :param entry: The entry of the page.
+        :return: The html.
+        """
+        return gzip.decompress(self._object_path(entry.digest).read_bytes()).decode('utf-8')
+
+    def latest(self, url: str) -> Optional[ArchiveEntry]:
+        """Finds the last fetch of a page, up to :attr:`as_of`.
+
+        :param url: The url of the page.
+        :return: The entry, ``None`` if the page wasn't archived.
+        """
+        entries: list[ArchiveEntry] = self._index.get(url, [])
+
+        if self.as_of is not None:
+            entries = [entry for entry in entries if datetime.fromisoformat(entry.fetched_at) <= self.as_of]
+
+        return max(entries, key=lambda entry: entry.fetched_at, default=None)
+
+    def load(self, url: str) -> str:
+        """Replays a page.
+
+        :param url: The url of the page.
+        :raises PageLoadError: If the page wasn't archived, like a page that couldn't be fetched.
+        :return: The html of its last fetch.
+        """
+        entry: Optional[ArchiveEntry] = self.latest(url)
+
+        if entry is None:
+            raise PageLoadError(f"{url} isn't archived")
+
+        return self.read(entry)
+
+    def entries(self, page_type: Optional[PageType] = None, url_prefix: str = "") -> Iterator[ArchiveEntry]:
+        """Iterates over the last fetch of the archived pages.
+
+        :param page_type: An optional kind of page to restrict the pages to.
+        :param url_prefix: An optional prefix of the urls, e.g. the base url of a site.
+        :return: The iterator over the entries.
+        """
+        for url in list(self._index):
+            if not url.startswith(url_prefix):
+                continue
+
+            entry: Optional[ArchiveEntry] = self.latest(url)
+
+            if entry is not None and (page_type is None or entry.page_type == page_type.value):
+                yield entry
@@ -0,0 +1,88 @@
+"""Replaces the fixture pages of ``benchmarks/fixtures`` with real pages, taken from the :class:`HtmlArchive` of a crawl.
+
+For each site, the last archived gallery page and listing page are copied, with their url and fetch time in
+``source.json``. On real-estate.am a listing holding a ``__NEXT_DATA__`` state is preferred, so the benchmark
+covers the extraction from the state. Run a crawl with an archive first, then::
+
+    python -m benchmarks.capture [--archive csvs/archive] [--site real_estate_am]
+"""
+import argparse
+import json
+from typing import Optional
+
+from rich import print
+
+from archive import ArchiveEntry, HtmlArchive
+from benchmarks.parsing import FIXTURES, SITES
+from fetchers import PageType
+from ListingScrapperBase import ListingScrapperBase
+
+
+def last_entry(archive: HtmlArchive,
+               scrapper: ListingScrapperBase,
+               page_type: PageType,
+               marker: Optional[str] = None) -> Optional[ArchiveEntry]:
+    """Finds the last archived page of a kind, preferring the ones holding a marker.
+
+    :param archive: The archive of a crawl.
+    :param scrapper: The scrapper of the site.
+    :param page_type: The kind of page.
+    :param marker: An optional pattern the page should hold.
+    :return: The entry, ``None`` if no page of the kind is archived.
+    """
+    entries: list[ArchiveEntry] = list(archive.entries(page_type, scrapper.url))
+
+    if marker is not None:
+        entries = [entry for entry in entries if marker in archive.read(entry)] or entries
+
+    return max(entries, key=lambda entry: entry.fetched_at, default=None)
+
+
+def capture(archive: HtmlArchive, site: str) -> None:
+    """Copies the last archived pages of a site into its fixtures.
+
+    :param archive: The archive of a crawl.
+    :param site: The name of the site.
+    """
+    scrapper: ListingScrapperBase = SITES[site](None)  # only its url is used
+    directory = FIXTURES / site
+    sources: dict[str, dict[str, str]] = {}
+
+    markers: dict[PageType, Optional[str]] = {
+        PageType.GALLERY: None,
+        PageType.LISTING: 'id="__NEXT_DATA__"' if site == 'real_estate_am' else None,
+    }
+
+    for page_type, marker in markers.items():
+        entry: Optional[ArchiveEntry] = last_entry(archive, scrapper, page_type, marker)
+
+        if entry is None:
+            print(f"No archived {page_type.value} page of {site}!")
+            continue
+
+        (directory / f"{page_type.value}.html").write_text(archive.read(entry), encoding='utf-8')
+        sources[page_type.value] = {'url': entry.url, 'fetched_at': entry.fetched_at}
+
+        print(f"{site}: {page_type.value} page captured from {entry.url}")
+
+    if sources:
+        path = directory / 'source.json'
+        previous: dict[str, dict[str, str]] = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+        path.write_text(json.dumps(previous | sources, indent=2), encoding='utf-8')
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Replaces the fixture pages with real pages of a crawl.")
+    arguments.add_argument('--archive', default='csvs/archive', help="the archive of a crawl to take the pages from")
+    arguments.add_argument('--site', choices=list(SITES), help="an optional site to restrict the capture to")
+    options = arguments.parse_args()
+
+    archive = HtmlArchive(options.archive, replay=True)
+
+    for site in SITES:
+        if options.site is None or site == options.site:
+            capture(archive, site)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""End-to-end load test of the crawler against the local stand-in of the sites (:mod:`benchmarks.mock_sites`).
+
+Every page is loaded over HTTP, so no browser is needed: the pool of drivers only sets how many pages are loaded at once.
+It runs a full crawl of each site for each number of workers and reports the listings per second, to see how
+the crawl scales and how it copes with slow or failing responses.
+
+    python -m benchmarks.crawl [--workers 1 2 4 8] [--pages 5] [--latency 0.05] [--error-rate 0.02] [--site estate_am]
+"""
+import argparse
+import time
+from typing import Optional
+
+from rich import print
+
+from benchmarks.mock_sites import MockSites
+from benchmarks.parsing import SITES
+from driver_pool import DriverPool
+from fetchers import PageType
+from ListingScrapperBase import ListingScrapperBase
+from pipeline import ListingPipeline
+
+
+def crawl(site: str, url: str, workers: int, parse_workers: int) -> dict[str, float]:
+    """Crawls every category of a site.
+
+    :param site: The name of the site.
+    :param url: The base url of the stand-in of the site.
+    :param workers: The number of pages loaded at once.
+    :param parse_workers: The number of threads parsing the pages.
+    :return: The number of listings, the failed pages, the time and the listings per second.
+    """
+    pool = DriverPool(drivers=[None] * workers)  # type: ignore # the pages are loaded over HTTP
+    pipeline = ListingPipeline(pool, parse_workers=parse_workers)
+
+    scrapper: ListingScrapperBase = SITES[site](None, driver_pool=pool, pipeline=pipeline, url=url)
+    scrapper.http_pages = frozenset(PageType)
+
+    listings: int = 0
+    failed: int = 0
+
+    start: float = time.perf_counter()
+
+    for category in scrapper.categories():
+        listings += sum(1 for _ in scrapper.iter_listings_of_category(category))
+        failed += pipeline.stats.failed  # the statistics are the ones of the last category
+
+    elapsed: float = time.perf_counter() - start
+
+    scrapper.http_fetcher.close()
+
+    return {
+        'listings': listings,
+        'failed': failed,
+        'seconds': elapsed,
+        'listings_per_second': listings / elapsed if elapsed else 0,
+    }
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Load tests the crawler against a local stand-in of the sites.")
+    arguments.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="the numbers of workers to try")
+    arguments.add_argument('--parsers', type=int, default=2, help="the number of threads parsing the pages")
+    arguments.add_argument('--site', choices=list(SITES), help="an optional site to restrict the crawl to")
+    arguments.add_argument('--port', type=int, default=8100, help="the port of the first site")
+    arguments.add_argument('--pages', type=int, default=5, help="the number of gallery pages of each category")
+    arguments.add_argument('--latency', type=float, default=0.05, help="the delay of each response, in seconds")
+    arguments.add_argument('--jitter', type=float, default=0.05, help="the maximum random delay added, in seconds")
+    arguments.add_argument('--error-rate', type=float, default=0, help="the share of the requests failing with a 503")
+    options = arguments.parse_args()
+
+    sites = MockSites(options.port, options.pages, options.latency, options.jitter, options.error_rate).start()
+
+    site: Optional[str] = options.site
+
+    try:
+        for name, url in sites.urls.items():
+            if site is not None and name != site:
+                continue
+
+            for workers in options.workers:
+                result: dict[str, float] = crawl(name, url, workers, options.parsers)
+
+                print(f"{name}, {workers} workers: {result['listings']} listings in {result['seconds']:.1f}s, "
+                      f"{result['listings_per_second']:.1f} listings/s, {result['failed']} failed")
+    finally:
+        sites.stop()
+
+
+if __name__ == '__main__':
+    main()
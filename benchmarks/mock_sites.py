@@ -0,0 +1,194 @@
+"""A local stand-in for the sites, serving the fixture pages, to load test the crawler without hammering the real ones.
+
+Each site is served on its own port, with the paths of the real site:
+
+- the gallery pages of every category, up to ``--pages`` pages, with different listings on each page,
+- the listings pages, all with the fixture of the site.
+
+The responses can be slowed down (``--latency``, ``--jitter``) and fail at random with a 503 (``--error-rate``).
+The scrappers are pointed at it with their ``url`` parameter, e.g. ``EstateAm(driver, url=sites.urls['estate_am'])``.
+
+    python -m benchmarks.mock_sites [--port 8100] [--pages 20] [--latency 0.1] [--jitter 0.05] [--error-rate 0.02]
+"""
+import argparse
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from typing import Final
+from urllib import parse
+
+from rich import print
+
+from benchmarks.parsing import FIXTURES, SITES
+from ListingScrapperBase import ListingScrapperBase
+
+LISTINGS_PER_PAGE: Final[int] = 1000  # the ids of the listings are shifted by this much per page (and category)
+LAST_NUMBER: Final[re.Pattern[str]] = re.compile(r'(\d+)(/?)$')
+
+
+class MockSite:
+    """The pages of one site.
+
+    :param scrapper: The scrapper of the site, used to recognise its galleries and listings.
+    :param fixtures: The directory of the fixture pages of the site.
+    :param pages: The number of gallery pages of each category.
+    """
+    scrapper: ListingScrapperBase
+    gallery: str
+    listing: str
+    pages: int
+
+    def __init__(self, scrapper: ListingScrapperBase, fixtures: Path, pages: int) -> None:
+        self.scrapper = scrapper
+        self.gallery = (fixtures / 'gallery.html').read_text(encoding='utf-8')
+        self.listing = (fixtures / 'listing.html').read_text(encoding='utf-8')
+        self.pages = pages
+
+        self._galleries: list[str] = [parse.urlsplit(f"/en/{category.value}").path
+                                      for category in scrapper.Endpoints]
+        self._links: list[str] = scrapper.gallery_links(self.gallery, 'fixture')
+
+    def page(self, url: str) -> tuple[int, str]:
+        """Builds the response to a request.
+
+        :param url: The path and query of the request.
+        :return: The status and the html.
+        """
+        path, _, query = url.partition('?')
+
+        for category, gallery in enumerate(self._galleries):
+            if path.startswith(gallery):
+                return self.gallery_page(category, self.page_number(path, query))
+
+        if path.startswith('/en/') and LAST_NUMBER.search(path):
+            return 200, self.listing
+
+        return 404, "<html><body>Not found</body></html>"
+
+    @staticmethod
+    def page_number(path: str, query: str) -> int:
+        """Reads the gallery page of a request, from the ``page`` parameter or the end of the path (list.am)."""
+        parameters: dict[str, list[str]] = parse.parse_qs(query)
+
+        if 'page' in parameters:
+            return int(parameters['page'][0])
+
+        last: str = path.rstrip('/').rsplit('/', 1)[-1]
+
+        return int(last) if last.isdigit() and path.count('/') > 3 else 0
+
+    def gallery_page(self, category: int, number: int) -> tuple[int, str]:
+        """Builds a gallery page, its listings are the ones of the fixture with other ids.
+
+        :param category: The index of the category.
+        :param number: The page number.
+        :return: The status and the html.
+        """
+        if number >= self.pages:  # past the end, a page without listings
+            return 200, "<html><body><div class='empty'>No results</div></body></html>"
+
+        html: str = self.gallery
+        shift: int = (category * self.pages + number) * LISTINGS_PER_PAGE
+
+        for link in self._links:
+            shifted: str = LAST_NUMBER.sub(lambda match: f"{int(match.group(1)) + shift}{match.group(2)}", link)
+            html = html.replace(f'"/en/{link}"', f'"/en/{shifted}"')
+
+        if self.scrapper.gallery_page_link is not None:  # the pagination shows the last page we serve
+            html = self.scrapper.gallery_page_link.sub(
+                lambda match: match.group(0)[:match.start(1) - match.start(0)] + str(self.pages - 1)
+                + match.group(0)[match.end(1) - match.start(0):], html)
+
+        return 200, html
+
+
+class MockSites:
+    """Serves every site on its own port, in background threads.
+
+    :param port: The port of the first site, the next sites take the next ports.
+    :param pages: The number of gallery pages of each category.
+    :param latency: The delay of each response, in seconds.
+    :param jitter: The maximum random delay added to the latency, in seconds.
+    :param error_rate: The share of the requests answered with a 503.
+    """
+    urls: dict[str, str]
+
+    def __init__(self,
+                 port: int = 8100,
+                 pages: int = 20,
+                 latency: float = 0,
+                 jitter: float = 0,
+                 error_rate: float = 0) -> None:
+        self.urls = {}
+        self._servers: list[ThreadingHTTPServer] = []
+
+        for offset, (name, scrapper_class) in enumerate(SITES.items()):
+            site = MockSite(scrapper_class(None), FIXTURES / name, pages)
+
+            class Handler(BaseHTTPRequestHandler):
+
+                mock: MockSite = site
+
+                def do_GET(self) -> None:
+                    time.sleep(latency + random.uniform(0, jitter))
+
+                    status, html = (503, "Service unavailable") if random.random() < error_rate \
+                        else self.mock.page(self.path)
+
+                    body: bytes = html.encode('utf-8')
+
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format: str, *args: object) -> None:
+                    pass  # one line per request would drown the crawl
+
+            server = ThreadingHTTPServer(('127.0.0.1', port + offset), Handler)
+            server.daemon_threads = True
+
+            self._servers.append(server)
+            self.urls[name] = f"http://127.0.0.1:{port + offset}/en/"
+
+    def start(self) -> 'MockSites':
+        """Starts serving in the background."""
+        for server in self._servers:
+            Thread(target=server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self) -> None:
+        """Stops serving."""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Serves the fixture pages of each site locally.")
+    arguments.add_argument('--port', type=int, default=8100, help="the port of the first site")
+    arguments.add_argument('--pages', type=int, default=20, help="the number of gallery pages of each category")
+    arguments.add_argument('--latency', type=float, default=0, help="the delay of each response, in seconds")
+    arguments.add_argument('--jitter', type=float, default=0, help="the maximum random delay added, in seconds")
+    arguments.add_argument('--error-rate', type=float, default=0, help="the share of the requests failing with a 503")
+    options = arguments.parse_args()
+
+    sites = MockSites(options.port, options.pages, options.latency, options.jitter, options.error_rate).start()
+
+    for name, url in sites.urls.items():
+        print(f"{name}: {url}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sites.stop()
+
+
+if __name__ == '__main__':
+    main()
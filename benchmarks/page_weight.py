@@ -0,0 +1,117 @@
+"""Measures what the resource blocking of the browser profile (:mod:`browser`) saves on the real pages of each site.
+
+Each listing page is loaded twice in the same browser, with the cache disabled: once with nothing blocked, once
+with the :attr:`blocked_urls` of the site. It reports the bytes downloaded, the requests and the load time of both.
+
+The pages are the last listings of an :class:`HtmlArchive` of a crawl, so a crawl with an archive has to be run first.
+It needs chrome and the network::
+
+    python -m benchmarks.page_weight [--archive csvs/archive] [--pages 5] [--site estate_am] [--headed]
+"""
+import argparse
+import statistics
+import time
+from typing import Optional
+
+import undetected_chromedriver as uc  # type: ignore
+from rich import print
+
+from archive import HtmlArchive
+from benchmarks.parsing import SITES
+from browser import BrowserProfile, PageWeight, block, page_weight
+from fetchers import PageType
+from ListingScrapperBase import ListingScrapperBase
+
+
+def weigh(webdriver: uc.Chrome, url: str, blocked_urls: tuple[str, ...]) -> tuple[PageWeight, float]:
+    """Loads a page and weighs it.
+
+    :param webdriver: The browser, logging its network.
+    :param url: The url of the page.
+    :param blocked_urls: The url patterns refused while loading it.
+    :return: The weight of the page and its load time, in seconds.
+    """
+    block(webdriver, blocked_urls)
+    page_weight(webdriver)  # what the previous page still downloaded isn't counted
+
+    weight: Optional[PageWeight]
+
+    try:
+        start: float = time.perf_counter()
+        webdriver.get(url)
+        elapsed: float = time.perf_counter() - start
+
+        time.sleep(1)  # the scripts of the page keep loading after the load event
+    finally:
+        weight = page_weight(webdriver)  # drained even on a timeout, not to be counted against the next page
+
+    if weight is None:
+        raise RuntimeError("The browser doesn't log its network!")
+
+    return weight, elapsed
+
+
+def compare(webdriver: uc.Chrome, scrapper: ListingScrapperBase, urls: list[str]) -> None:
+    """Prints what the blocking saves on some pages of a site.
+
+    :param webdriver: The browser.
+    :param scrapper: The scrapper of the site.
+    :param urls: The urls of the listings pages.
+    """
+    full: list[tuple[PageWeight, float]] = []
+    light: list[tuple[PageWeight, float]] = []
+
+    for url in urls:
+        full.append(weigh(webdriver, url, ()))
+        light.append(weigh(webdriver, url, scrapper.blocked_urls))
+
+    full_bytes: float = statistics.mean(weight.bytes for weight, _ in full)
+    light_bytes: float = statistics.mean(weight.bytes for weight, _ in light)
+
+    print(f"{scrapper.url}: {full_bytes / 1024:.0f}KiB -> {light_bytes / 1024:.0f}KiB per page "
+          f"({(full_bytes - light_bytes) / 1024:.0f}KiB saved, {1 - light_bytes / full_bytes if full_bytes else 0:.0%}), "
+          f"{statistics.mean(weight.requests for weight, _ in full):.0f} -> "
+          f"{statistics.mean(weight.requests for weight, _ in light):.0f} requests "
+          f"({statistics.mean(weight.blocked for weight, _ in light):.0f} blocked), "
+          f"{statistics.median(seconds for _, seconds in full):.2f}s -> "
+          f"{statistics.median(seconds for _, seconds in light):.2f}s to load")
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Measures the bytes the resource blocking saves on each site.")
+    arguments.add_argument('--archive', default='csvs/archive', help="the archive of a crawl to take the urls from")
+    arguments.add_argument('--pages', type=int, default=5, help="the number of listings pages of each site")
+    arguments.add_argument('--site', choices=list(SITES), help="an optional site to restrict the measure to")
+    arguments.add_argument('--headed', action='store_true', help="show the browser")
+    options = arguments.parse_args()
+
+    archive = HtmlArchive(options.archive, replay=True)
+    profile = BrowserProfile(headless=not options.headed)
+
+    browser_options = uc.ChromeOptions()
+    profile.configure(browser_options)
+
+    webdriver = uc.Chrome(options=browser_options, headless=profile.headless)
+
+    try:
+        webdriver.execute_cdp_cmd('Network.enable', {})
+        webdriver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+
+        for name, scrapper_class in SITES.items():
+            if options.site is not None and name != options.site:
+                continue
+
+            scrapper: ListingScrapperBase = scrapper_class(None)  # only its url and blocked urls are used
+            urls: list[str] = [entry.url for entry in archive.entries(PageType.LISTING, scrapper.url)][-options.pages:]
+
+            if not urls:
+                print(f"No archived listing of {name}!")
+                continue
+
+            compare(webdriver, scrapper, urls)
+    finally:
+        webdriver.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""Offline benchmark of the parsing of the pages of each site.
+
+It measures, on saved pages:
+
+- the time to get the listings links of a gallery page (:meth:`get_listings_links_from_gallery` without the loading),
+- the time to extract a listing page (:meth:`get_listing_data`), and the time to find each of its fields,
+- the listings extracted per second,
+- the peak memory of an extraction.
+
+The pages are the fixtures of ``benchmarks/fixtures``, or the last pages of an :class:`HtmlArchive` of a real crawl.
+The fixtures are small hand-written pages until real ones are captured with :mod:`benchmarks.capture`, their timings
+don't reflect the size of the real pages. The results are saved in ``benchmarks/results`` and compared to the previous
+run, so a slower selector shows up.
+
+On real-estate.am, the pages holding a ``__NEXT_DATA__`` state are also extracted from the state alone, and each
+field found in it is checked against the one of the DOM.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.parsing [--rounds 20] [--archive csvs/archive] [--pages 10]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Final, Optional
+
+from rich import print
+
+from ListAm import ListAm
+from EstateAm import EstateAm
+from RealEstateAm import RealEstateAm
+from ListingScrapperBase import ListingScrapperBase
+from archive import HtmlArchive
+from fetchers import PageType
+from parsers import make_soup
+
+FIXTURES: Final[Path] = Path(__file__).parent / 'fixtures'
+RESULTS: Final[Path] = Path(__file__).parent / 'results'
+REGRESSION: Final[float] = 1.2  # a time this much slower than the previous run is reported
+
+SITES: Final[dict[str, type[ListingScrapperBase]]] = {
+    'list_am': ListAm,
+    'estate_am': EstateAm,
+    'real_estate_am': RealEstateAm,
+}
+
+Page = tuple[str, str, str]  # url, html, rent_or_sale
+
+
+def measure(function: Callable[[], Any], rounds: int) -> dict[str, float]:
+    """Times a function.
+
+    :param function: The function to time.
+    :param rounds: The number of calls.
+    :return: The median and the minimum time of a call, in seconds.
+    """
+    times: list[float] = []
+
+    for _ in range(rounds):
+        start: float = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return {'median': statistics.median(times), 'min': min(times)}
+
+
+def peak_memory(function: Callable[[], Any]) -> float:
+    """Measures the memory allocated by a call at its peak.
+
+    :param function: The function to measure.
+    :return: The peak, in KiB.
+    """
+    tracemalloc.start()
+
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def fixture_sources(site: str) -> dict[str, dict[str, str]]:
+    """Where the fixture pages of a site were captured from, see :mod:`benchmarks.capture`.
+
+    :param site: The name of the site.
+    :return: The url and fetch time of each captured page, nothing for hand-written pages.
+    """
+    path: Path = FIXTURES / site / 'source.json'
+
+    return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+
+def fixture_pages(site: str, scrapper: ListingScrapperBase) -> tuple[list[Page], list[Page]]:
+    """The fixture pages of a site.
+
+    :param site: The name of the site.
+    :param scrapper: The scrapper of the site.
+    :return: The gallery pages and the listings pages.
+    """
+    gallery: str = (FIXTURES / site / 'gallery.html').read_text(encoding='utf-8')
+    listing: str = (FIXTURES / site / 'listing.html').read_text(encoding='utf-8')
+
+    sources: dict[str, dict[str, str]] = fixture_sources(site)
+    gallery_url: str = sources.get('gallery', {}).get('url', f"{scrapper.url}gallery")
+    listing_url: str = sources.get('listing', {}).get('url', f"{scrapper.url}item/1234567/")
+
+    return [(gallery_url, gallery, 'sale')], [(listing_url, listing, 'sale')]
+
+
+def archived_pages(archive: HtmlArchive, scrapper: ListingScrapperBase, count: int) -> tuple[list[Page], list[Page]]:
+    """The last archived pages of a site.
+
+    :param archive: The archive of a crawl.
+    :param scrapper: The scrapper of the site.
+    :param count: The maximum number of pages of each kind.
+    :return: The gallery pages and the listings pages.
+    """
+    galleries: list[Page] = [(entry.url, archive.read(entry), 'sale')
+                             for entry in list(archive.entries(PageType.GALLERY, scrapper.url))[-count:]]
+    listings: list[Page] = [(entry.url, archive.read(entry), entry.rent_or_sale or 'sale')
+                            for entry in list(archive.entries(PageType.LISTING, scrapper.url))[-count:]]
+
+    return galleries, listings
+
+
+def bench_gallery(scrapper: ListingScrapperBase, pages: list[Page], rounds: int) -> dict[str, Any]:
+    """Benchmarks the extraction of the links of gallery pages.
+
+    :param scrapper: The scrapper of the site.
+    :param pages: The gallery pages.
+    :param rounds: The number of rounds.
+    :return: The results.
+    """
+
+    def links() -> int:
+        found: int = 0
+
+        for url, html, _ in pages:
+            scrapper.processed_links = set()
+            found += len(scrapper.new_endpoints(scrapper.gallery_links(html, url)))
+
+        return found
+
+    return {
+        'pages': len(pages),
+        'links': links(),
+        'time': measure(links, rounds),
+        'peak_memory_kib': peak_memory(links),
+    }
+
+
+def bench_listing(scrapper: ListingScrapperBase, pages: list[Page], rounds: int) -> dict[str, Any]:
+    """Benchmarks the extraction of listings pages, as a whole and field by field.
+
+    :param scrapper: The scrapper of the site.
+    :param pages: The listings pages.
+    :param rounds: The number of rounds.
+    :return: The results.
+    """
+
+    def extract() -> None:
+        for url, html, rent_or_sale in pages:
+            scrapper.SoupExtractor.get_listing_data(html, url, rent_or_sale)
+
+    timing: dict[str, float] = measure(extract, rounds)
+
+    soups = [make_soup(html, scrapper.parser) for _, html, _ in pages]
+
+    fields: dict[str, dict[str, float]] = {
+        'soup': measure(lambda: [make_soup(html, scrapper.parser) for _, html, _ in pages], rounds),
+        'all_fields': measure(lambda: [scrapper.SoupFinder.FIELDS.extract(soup) for soup in soups], rounds),
+    }
+
+    for spec in scrapper.SoupFinder.FIELDS.specs:
+        fields[spec.name] = measure(lambda: [spec.find(soup) for soup in soups], rounds)
+
+    results: dict[str, Any] = {
+        'pages': len(pages),
+        'time': timing,
+        'records_per_second': len(pages) / timing['median'] if timing['median'] else None,
+        'peak_memory_kib': peak_memory(extract),
+        'fields': fields,
+    }
+
+    if isinstance(scrapper, RealEstateAm):
+        states: list[str] = [html for _, html, _ in pages if RealEstateAm.NextData.load(html) is not None]
+
+        if states:
+            fields['next_data'] = measure(
+                lambda: [RealEstateAm.NextDataExtractor.get_listing_data(html) for html in states], rounds)
+            results['next_data_mismatches'] = check_next_data(pages)
+
+    return results
+
+
+def check_next_data(pages: list[Page]) -> dict[str, int]:
+    """Checks the fields real-estate.am gives in its ``__NEXT_DATA__`` state against the ones of its DOM.
+
+    :param pages: The listings pages.
+    :return: The number of pages where each field of the state differs from the DOM.
+    """
+    mismatches: dict[str, int] = {}
+
+    use_next_data: bool = RealEstateAm.use_next_data
+    RealEstateAm.use_next_data = False  # the DOM alone
+
+    try:
+        for url, html, rent_or_sale in pages:
+            state: Optional[dict[str, Any]] = RealEstateAm.NextDataExtractor.get_listing_data(html)
+
+            if not state:
+                continue
+
+            dom: dict[str, Any] = RealEstateAm.SoupExtractor.get_listing_data(html, url, rent_or_sale)
+
+            for key, value in state.items():
+                if str(value) != str(dom[key]):
+                    mismatches[key] = mismatches.get(key, 0) + 1
+                    print(f"[red]{url}: {key} is {value!r} in the state, {dom[key]!r} in the DOM[/red]")
+    finally:
+        RealEstateAm.use_next_data = use_next_data
+
+    return mismatches
+
+
+def commit() -> str:
+    """The current commit of the repository, ``unknown`` outside of git."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def medians(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    """Flattens the median times of results.
+
+    :param results: The results, or a part of them.
+    :param prefix: The path of the part.
+    :return: The median times by path.
+    """
+    flat: dict[str, float] = {}
+
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+
+        if 'median' in value:
+            flat[f"{prefix}{key}"] = value['median']
+        else:
+            flat |= medians(value, f"{prefix}{key}.")
+
+    return flat
+
+
+def compare(previous: dict[str, Any], current: dict[str, Any]) -> None:
+    """Prints the times that got slower than in a previous run.
+
+    :param previous: The results of the previous run.
+    :param current: The results of this run.
+    """
+    before: dict[str, float] = medians(previous['sites'])
+    slower: int = 0
+
+    for path, median in medians(current['sites']).items():
+        if before.get(path) and median / before[path] >= REGRESSION:
+            print(f"[red]{path}: {median * 1000:.2f}ms, x{median / before[path]:.2f} since {previous['commit']}[/red]")
+            slower += 1
+
+    if not slower:
+        print(f"Nothing slower than in {previous['commit']}.")
+
+
+def run(rounds: int, archive: Optional[HtmlArchive] = None, pages: int = 10) -> dict[str, Any]:
+    """Benchmarks every site.
+
+    :param rounds: The number of rounds of each measure.
+    :param archive: An optional archive to take the pages from, instead of the fixtures.
+    :param pages: The maximum number of archived pages of each kind per site.
+    :return: The results.
+    """
+    results: dict[str, Any] = {
+        'commit': commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pages': 'archive' if archive is not None else 'fixtures',
+        'sites': {},
+    }
+
+    for site, scrapper_class in SITES.items():
+        scrapper: ListingScrapperBase = scrapper_class(None)  # no page is loaded
+
+        galleries, listings = archived_pages(archive, scrapper, pages) if archive is not None \
+            else fixture_pages(site, scrapper)
+
+        results['sites'][site] = {'parser': scrapper.parser}
+
+        if archive is None:
+            results['sites'][site]['captured'] = bool(fixture_sources(site))
+
+            if not results['sites'][site]['captured']:
+                print(f"[yellow]{site}: hand-written fixtures, capture real pages with benchmarks.capture[/yellow]")
+
+        if galleries:
+            results['sites'][site]['gallery'] = bench_gallery(scrapper, galleries, rounds)
+
+        if listings:
+            results['sites'][site]['listing'] = listing = bench_listing(scrapper, listings, rounds)
+            print(f"{site}: {listing['records_per_second']:.0f} listings/s, "
+                  f"{listing['time']['median'] / len(listings) * 1000:.2f}ms per page, "
+                  f"{listing['peak_memory_kib']:.0f}KiB peak")
+
+    return results
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Benchmarks the parsing of the pages of each site.")
+    arguments.add_argument('--rounds', type=int, default=20, help="the number of rounds of each measure")
+    arguments.add_argument('--archive', help="an archive of a crawl to take the pages from, instead of the fixtures")
+    arguments.add_argument('--pages', type=int, default=10, help="the number of archived pages of each kind per site")
+    options = arguments.parse_args()
+
+    archive: Optional[HtmlArchive] = HtmlArchive(options.archive, replay=True) if options.archive else None
+
+    results: dict[str, Any] = run(options.rounds, archive, options.pages)
+
+    RESULTS.mkdir(exist_ok=True)
+
+    runs: list[dict[str, Any]] = [json.loads(path.read_text(encoding='utf-8')) for path in sorted(RESULTS.glob('*.json'))]
+    runs = [previous for previous in runs if previous['pages'] == results['pages']]  # fixtures and archives differ
+
+    if runs:
+        compare(runs[-1], results)
+
+    path: Path = RESULTS / f"{results['date'].replace(':', '-')}-{results['commit']}.json"
+    path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    print(f"Results saved in {path}")
+
+
+if __name__ == '__main__':
+    main()
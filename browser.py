@@ -0,0 +1,108 @@
+import json
+from dataclasses import dataclass
+from threading import Lock
+from typing import Final, Optional
+from weakref import WeakKeyDictionary
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chromium.options import ChromiumOptions
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+# url patterns of the resources no extraction needs, in the wildcard syntax of `Network.setBlockedURLs`
+FONTS: Final[tuple[str, ...]] = ('*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*')
+STYLESHEETS: Final[tuple[str, ...]] = ('*.css', '*.css?*')
+IMAGES: Final[tuple[str, ...]] = ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico')
+MEDIA: Final[tuple[str, ...]] = ('*.mp4', '*.webm', '*.mp3')
+TRACKERS: Final[tuple[str, ...]] = ('*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                                    '*googlesyndication.com*', '*adservice.google.*', '*connect.facebook.net*',
+                                    '*mc.yandex.ru*', '*an.yandex.ru*', '*yandex.ru/ads*', '*hotjar.com*')
+MAP_TILES: Final[tuple[str, ...]] = ('*tiles.maps.yandex.net*', '*core-renderer-tiles*', '*static-maps.yandex.ru*')
+
+# the api of the yandex maps (api-maps.yandex.ru) is never blocked, the coordinates come from it
+COMMON_BLOCKED_URLS: Final[tuple[str, ...]] = FONTS + IMAGES + MEDIA + TRACKERS + MAP_TILES
+
+_blocked: WeakKeyDictionary[WebDriver, tuple[str, ...]] = WeakKeyDictionary()  # what each browser already blocks
+_lock = Lock()
+
+
+@dataclass(frozen=True)
+class PageWeight:
+    """What a browser downloaded for a page, read from its network log."""
+    bytes: int  # as transferred, compressed
+    requests: int
+    blocked: int  # requests refused by :func:`block`
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """A lightweight browser for the crawl: headless, without images, and with the resources of
+    :attr:`ListingScrapperBase.blocked_urls` refused through the DevTools protocol.
+
+    :param headless: Whether the browser runs without a window.
+    :param log_network: Whether the browser logs its network, to count the bytes of each page (:func:`page_weight`).
+    :param window_size: The size of the window, the small default of headless chrome hides some elements.
+    """
+    headless: bool = True
+    log_network: bool = True
+    window_size: str = '1920,1080'
+
+    def configure(self, options: ChromiumOptions) -> None:
+        """Sets up the options of a new browser.
+
+        The headless mode itself is given to the driver (e.g. ``uc.Chrome(headless=...)``), it patches it.
+
+        :param options: The options of the browser.
+        """
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument(f'--window-size={self.window_size}')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+
+        if self.log_network:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def block(webdriver: WebDriver, urls: tuple[str, ...]) -> None:
+    """Makes a browser refuse the requests to some urls, until it is told otherwise.
+
+    Nothing is sent if the browser already blocks them, the drivers of a pool switch sites between categories.
+
+    :param webdriver: The browser.
+    :param urls: The url patterns to block, ``*`` matching anything.
+    """
+    with _lock:
+        if _blocked.get(webdriver) == urls:
+            return
+
+    webdriver.execute_cdp_cmd('Network.enable', {})
+    webdriver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(urls)})
+
+    with _lock:
+        _blocked[webdriver] = urls
+
+
+def page_weight(webdriver: WebDriver) -> Optional[PageWeight]:
+    """Reads what a browser downloaded since the last call, from its network log.
+
+    :param webdriver: The browser, configured with ``log_network``.
+    :return: The weight, ``None`` if the browser doesn't log its network.
+    """
+    try:
+        entries: list[dict] = webdriver.get_log('performance')
+    except WebDriverException:
+        return None
+
+    size: int = 0
+    requests: int = 0
+    blocked: int = 0
+
+    for entry in entries:
+        message: dict = json.loads(entry['message'])['message']
+
+        if message['method'] == 'Network.loadingFinished':
+            size += int(message['params'].get('encodedDataLength', 0))
+            requests += 1
+        elif message['method'] == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+            blocked += 1
+
+    return PageWeight(size, requests, blocked)
@@ -0,0 +1,102 @@
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+from rich import print
+
+
+class CrawlCheckpoint:
+    """The progress of the crawl of a category of a site, saved so a restarted run can resume it.
+
+    The state of the gallery (harvested endpoints, next page) is kept in a json file, rewritten after each gallery page.
+    The completed listings are appended to a separate log, once they are saved by the writer.
+
+    :param directory: The directory of the checkpoints.
+    :param site: The name of the site.
+    :param category: The name of the category.
+    """
+    state_path: Path
+    done_path: Path
+    endpoints: list[str]
+    next_page: int
+    gallery_done: bool
+    completed: set[str]
+    finished: bool
+
+    def __init__(self, directory: str, site: str, category: str) -> None:
+        self.state_path = Path(directory) / f"{site}-{category}.json"
+        self.done_path = Path(directory) / f"{site}-{category}.done"
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.endpoints = []
+        self.next_page = 0
+        self.gallery_done = False
+        self.completed = set()
+        self.finished = False  # every endpoint was visited, only known by the running crawl
+
+        self._load()
+
+    def _load(self) -> None:
+        if self.state_path.exists():
+            try:
+                state = json.loads(self.state_path.read_text(encoding='utf-8'))
+                self.endpoints = list(state['endpoints'])
+                self.next_page = int(state['next_page'])
+                self.gallery_done = bool(state['gallery_done'])
+            except (OSError, ValueError, KeyError):
+                print(f"Ignoring the corrupted checkpoint {self.state_path}!")
+
+        if self.done_path.exists():
+            with self.done_path.open(encoding='utf-8') as file:
+                self.completed = {line.rstrip('\n') for line in file if line.strip()}
+
+        if self.endpoints or self.completed:
+            print(f"Resuming from {self.state_path.name}: {len(self.endpoints)} endpoints, "
+                  f"{len(self.completed)} listings done.")
+
+    def _save(self) -> None:
+        temporary: Path = self.state_path.with_suffix('.tmp')
+        temporary.write_text(json.dumps({
+            'endpoints': self.endpoints,
+            'next_page': self.next_page,
+            'gallery_done': self.gallery_done,
+        }), encoding='utf-8')
+        temporary.replace(self.state_path)
+
+    def record_gallery_page(self, page: int, endpoints: list[str]) -> None:
+        """Saves the endpoints harvested on a gallery page.
+
+        :param page: The number of the page.
+        :param endpoints: The endpoints found on it.
+        """
+        self.endpoints += endpoints
+        self.next_page = page + 1
+        self._save()
+
+    def finish_gallery(self) -> None:
+        """Saves that every gallery page was visited."""
+        self.gallery_done = True
+        self._save()
+
+    def complete(self, links: Iterable[str]) -> None:
+        """Saves that listings are done.
+
+        :param links: The links of the listings.
+        """
+        new: list[str] = [link for link in links if link not in self.completed]
+
+        if not new:
+            return
+
+        with self.done_path.open('a', encoding='utf-8') as file:
+            file.writelines(f"{link}\n" for link in new)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.completed.update(new)
+
+    def clear(self) -> None:
+        """Deletes the checkpoint, once the category was fully crawled."""
+        self.state_path.unlink(missing_ok=True)
+        self.done_path.unlink(missing_ok=True)
@@ -1,15 +1,170 @@
-from typing import Optional
+import json
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Final, Optional
 
 import requests
 
-amd_data = requests.get('https://open.er-api.com/v6/latest/AMD').json()
-usd_data = requests.get('https://open.er-api.com/v6/latest/USD').json()
+from rich import print
+
+RATES_URL: Final[str] = 'https://open.er-api.com/v6/latest/USD'
+RATES_CACHE: Final[str] = '.cache/exchange_rates.json'
+RATES_TTL: Final[float] = 12 * 60 * 60  # the api updates its rates once a day
+RATES_RETRY: Final[float] = 60  # seconds before trying again to load rates that couldn't be loaded
+
+
+class RateProvider:
+    """Gives the exchange rates from a single table of rates, loaded on the first conversion.
+
+    The table is kept in a cache file and only fetched again once it is older than the ttl.
+    If the source can't be reached an outdated cache is still used, without one the loading is tried again after a while.
+
+    :param source: The url of the rates (in the open.er-api format) or the path of a local json file with the same format.
+    :param cache: The path of the cache file, ``None`` to never cache the rates.
+    :param ttl: The number of seconds the cached rates are considered up to date.
+    """
+    source: str
+    cache: Optional[Path]
+    ttl: float
+
+    def __init__(self, source: str = RATES_URL, cache: Optional[str] = RATES_CACHE, ttl: float = RATES_TTL) -> None:
+        self.source = source
+        self.cache = Path(cache) if cache else None
+        self.ttl = ttl
+
+        self._base: Optional[str] = None
+        self._rates: Optional[dict[str, float]] = None
+        self._failed_at: Optional[float] = None
+        self._lock = Lock()
+
+    @classmethod
+    def from_environment(cls) -> 'RateProvider':
+        """Creates a provider configured by the ``SCRAPPER_RATES_SOURCE``, ``SCRAPPER_RATES_CACHE`` and ``SCRAPPER_RATES_TTL`` variables.
+
+        :return: The provider.
+        """
+        return cls(
+            source=os.environ.get('SCRAPPER_RATES_SOURCE', RATES_URL),
+            cache=os.environ.get('SCRAPPER_RATES_CACHE', RATES_CACHE),
+            ttl=float(os.environ.get('SCRAPPER_RATES_TTL', RATES_TTL)),
+        )
+
+    def rates(self) -> tuple[str, dict[str, float]]:
+        """Gets the table of rates, loading it if needed.
+
+        :return: The base currency of the table and the rates of every currency against it,
+            no rates while they can't be loaded.
+        """
+        if self._rates is None:
+            with self._lock:
+                if self._rates is None and (self._failed_at is None
+                                            or time.monotonic() - self._failed_at >= RATES_RETRY):
+                    loaded: Optional[tuple[str, dict[str, float]]] = self._load()
+
+                    if loaded is None:  # not kept, the next conversion after the retry delay tries again
+                        self._failed_at = time.monotonic()
+                    else:
+                        self._base, self._rates = loaded
+                        self._failed_at = None
+
+        if self._rates is None:
+            return "", {}
+
+        return self._base, self._rates  # type: ignore
+
+    def rate(self, base: str, to: str) -> Optional[float]:
+        """Computes the cross rate between two currencies.
+
+        :param base: The currency to convert from.
+        :param to: The currency to convert to.
+        :return: The rate, ``None`` if one of the currencies is unknown.
+        """
+        _, rates = self.rates()
+
+        if base not in rates or to not in rates or not rates[base]:
+            return None
+
+        return rates[to] / rates[base]
+
+    def refresh(self) -> None:
+        """Forgets the loaded table, the next conversion loads it again."""
+        with self._lock:
+            self._base, self._rates = None, None
+            self._failed_at = None
+
+    def _load(self) -> Optional[tuple[str, dict[str, float]]]:
+        cached: Optional[dict[str, Any]] = self._read_cache()
+
+        if cached is not None and time.time() - cached['fetched_at'] < self.ttl:
+            return cached['base'], cached['rates']
+
+        try:
+            fetched: dict[str, Any] = self._fetch()
+        except (requests.RequestException, OSError, ValueError, KeyError) as e:
+            if cached is None:
+                print(f"Couldn't load the exchange rates from {self.source}, trying again in {RATES_RETRY:.0f}s! "
+                      f"({type(e).__name__}: {e})")
+                return None
+
+            print("Couldn't refresh the exchange rates, using the cached ones!")
+            return cached['base'], cached['rates']
+
+        self._write_cache(fetched)
+
+        return fetched['base'], fetched['rates']
+
+    def _fetch(self) -> dict[str, Any]:
+        if self.source.startswith(('http://', 'https://')):
+            response = requests.get(self.source, timeout=20)
+            response.raise_for_status()
+            data = response.json()
+        else:
+            with open(self.source, encoding='utf-8') as file:
+                data = json.load(file)
+
+        return {
+            'fetched_at': time.time(),
+            'base': data.get('base_code') or data['base'],
+            'rates': {currency: float(rate) for currency, rate in data['rates'].items()},
+        }
+
+    def _read_cache(self) -> Optional[dict[str, Any]]:
+        if self.cache is None or not self.cache.exists():
+            return None
+
+        try:
+            with self.cache.open(encoding='utf-8') as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if not {'fetched_at', 'base', 'rates'} <= cached.keys():
+            return None
+
+        return cached
+
+    def _write_cache(self, data: dict[str, Any]) -> None:
+        if self.cache is None:
+            return
+
+        try:
+            self.cache.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.cache.with_suffix('.tmp')
+            temporary.write_text(json.dumps(data), encoding='utf-8')
+            temporary.replace(self.cache)
+        except OSError:
+            print("Couldn't cache the exchange rates!")
+
+
+provider: RateProvider = RateProvider.from_environment()
 
 
 def convert(amount: float, base: Optional[str], to: Optional[str]) -> float:
-    """Converts an amount of AMD or USD to most currencies
+    """Converts an amount between any two currencies of the rates table
 
-    :param amount: The amount of AMD or USD.
+    :param amount: The amount.
     :param base: The base currency.
     :param to: The target currency.
     :return: The converted amount.
@@ -18,12 +173,10 @@ def convert(amount: float, base: Optional[str], to: Optional[str]) -> float:
     if not base or not to:
         return 0
 
-    if base == 'AMD':
-        return amount * amd_data['rates'][to]
+    rate: Optional[float] = provider.rate(base, to)
 
-    if base == 'USD':
-        return amount * usd_data['rates'][to]
-
-    print("UNABLE TO CONVERT")
+    if rate is None:
+        print("UNABLE TO CONVERT")
+        return 0
 
-    return 0
+    return amount * rate
@@ -0,0 +1,165 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from queue import Empty, Queue
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+import urllib3
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from rich import print
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class DriverPool:
+    """A fixed size pool of webdrivers that work can be fanned out to.
+
+    Each driver is only ever used by one task at a time. A driver that crashes is retired
+    (and replaced when a factory is available) without affecting the tasks running on the other drivers.
+
+    :param factory: The callable used to create a new driver, ``None`` if the pool can't grow back.
+    :param size: The number of drivers to keep in the pool.
+    :param drivers: Already created drivers to put in the pool.
+    """
+    factory: Optional[Callable[[], WebDriver]]
+    size: int
+    drivers: list[WebDriver]
+
+    def __init__(self,
+                 factory: Optional[Callable[[], WebDriver]] = None,
+                 size: int = 1,
+                 drivers: Optional[list[WebDriver]] = None) -> None:
+
+        self.factory = factory
+        self.drivers = list(drivers or [])
+
+        if factory is not None:
+            # created one after the other, undetected_chromedriver doesn't like concurrent patching
+            while len(self.drivers) < size:
+                self.drivers.append(factory())
+
+        self.size = len(self.drivers)
+
+        if not self.size:
+            raise ValueError("A driver pool needs at least one driver !")
+
+        self._available: Queue[WebDriver] = Queue()
+        for driver in self.drivers:
+            self._available.put(driver)
+
+    @classmethod
+    def of(cls, webdriver: WebDriver) -> 'DriverPool':
+        """Wraps a single existing driver into a pool.
+
+        :param webdriver: The driver to wrap.
+        :return: The pool of size 1.
+        """
+        return cls(drivers=[webdriver])
+
+    @property
+    def primary(self) -> WebDriver:
+        """The first alive driver of the pool, used for the sequential work (e.g. galleries)."""
+        if not self.drivers:
+            raise RuntimeError("Every driver of the pool has died !")
+
+        return self.drivers[0]
+
+    def imap(self, task: Callable[[WebDriver, T], Optional[R]], items: Iterable[T]) -> Iterator[Optional[R]]:
+        """Runs ``task(driver, item)`` for every item on the drivers of the pool.
+
+        The results are yielded in the order of the items. If a driver crashes while handling an item,
+        ``None`` is yielded for that item and the driver is retired.
+        Only a few items per driver are submitted ahead, so the pending results stay bounded.
+
+        :param task: The function to run for each item.
+        :param items: The items to distribute.
+        :return: An iterator over the results.
+        """
+        remaining: Iterator[T] = iter(items)
+
+        executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='driver')
+
+        try:
+            pending: deque[Future[Optional[R]]] = deque(
+                executor.submit(self._run, task, item) for item in islice(remaining, 2 * self.size))
+
+            while pending:
+                result: Optional[R] = pending.popleft().result()
+
+                for item in islice(remaining, 1):
+                    pending.append(executor.submit(self._run, task, item))
+
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, task: Callable[[WebDriver, T], Optional[R]], item: T) -> Optional[R]:
+        driver: WebDriver
+
+        while True:
+            if not self.drivers:  # every driver died, nobody will give one back
+                return None
+
+            try:
+                driver = self._available.get(timeout=1)
+                break
+            except Empty:
+                continue
+
+        try:
+            result = task(driver, item)
+        except (WebDriverException, urllib3.exceptions.MaxRetryError) as e:
+            if self._is_alive(driver):
+                print(f"Page failed on a driver! ({type(e).__name__})")
+                self._available.put(driver)
+            else:
+                print(f"Driver crashed, retiring it! ({type(e).__name__})")
+                self._retire(driver)
+
+            return None
+
+        self._available.put(driver)
+
+        return result
+
+    @staticmethod
+    def _is_alive(driver: WebDriver) -> bool:
+        try:
+            _ = driver.current_url
+            return True
+        except (WebDriverException, urllib3.exceptions.MaxRetryError):
+            return False
+
+    def _retire(self, driver: WebDriver) -> None:
+        if driver in self.drivers:
+            self.drivers.remove(driver)
+
+        try:
+            driver.quit()
+        except (WebDriverException, urllib3.exceptions.MaxRetryError):
+            pass
+
+        if self.factory is None:
+            return
+
+        try:
+            replacement: WebDriver = self.factory()
+        except WebDriverException:
+            print("Couldn't replace the driver!")
+            return
+
+        self.drivers.append(replacement)
+        self._available.put(replacement)
+
+    def quit(self) -> None:
+        """Closes every driver of the pool."""
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except (WebDriverException, urllib3.exceptions.MaxRetryError):
+                pass
+
+        self.drivers.clear()
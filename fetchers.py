@@ -0,0 +1,86 @@
+from enum import Enum
+from typing import Final
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT: Final[str] = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                          "Chrome/127.0.0.0 Safari/537.36")
+
+
+class PageType(Enum):
+    """The kinds of pages a scrapper loads."""
+
+    GALLERY = "gallery"
+    LISTING = "listing"
+
+
+class PageLoadError(TimeoutError):
+    """Raised when a page couldn't be fetched.
+
+    It is a :class:`TimeoutError` so that it is handled like a page that didn't load in the browser.
+    """
+
+
+class PageRedirectError(PageLoadError):
+    """Raised when a page redirected elsewhere, like a gallery page past the last one."""
+
+
+class NoListingsError(PageLoadError):
+    """Raised when a gallery page loaded but holds no listings, the end of the gallery."""
+
+
+class HttpFetcher:
+    """Fetches pages over plain HTTP, for the pages that don't need javascript to hold their data.
+
+    It uses a single keep-alive :class:`requests.Session` with a connection pool, it can be shared between threads.
+
+    :param pool_size: The maximum number of connections kept open per host.
+    :param timeout_limit: The maximum number of seconds to wait for a response.
+    :param retries: The number of retries on connection errors and 5xx responses.
+    """
+    session: requests.Session
+    timeout_limit: float
+
+    def __init__(self, pool_size: int = 10, timeout_limit: float = 20, retries: int = 2) -> None:
+        self.timeout_limit = timeout_limit
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504)),
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url: str) -> str:
+        """Fetches the html of a page.
+
+        Like ``ec.url_to_be`` in the browser, a redirection is considered as a failure.
+
+        :param url: The url of the page.
+        :raises PageLoadError: If the page couldn't be fetched.
+        :raises PageRedirectError: If the page redirected elsewhere.
+        :return: The html of the page.
+        """
+        try:
+            response = self.session.get(url, timeout=self.timeout_limit)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise PageLoadError(f"Couldn't fetch {url} ({type(e).__name__})") from e
+
+        if response.url != url:
+            raise PageRedirectError(f"{url} redirected to {response.url}")
+
+        return response.text
+
+    def close(self) -> None:
+        """Closes the connections of the session."""
+        self.session.close()
@@ -0,0 +1,142 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+
+@dataclass(frozen=True)
+class Selector:
+    """Describes the elements to match, like the arguments of ``soup.find``.
+
+    :param name: The name of the tag.
+    :param class_: The class of the tag, a string with spaces must match the whole class attribute (like in bs4).
+    :param attrs: The attributes of the tag, ``True`` only checks that the attribute is there.
+    :param string: If the tag must only contain a string (like ``string=True`` in bs4).
+    :param predicate: An additional check on the tag.
+    :param within: A selector one of the parents of the tag must match.
+    """
+    name: str
+    class_: Optional[str] = None
+    attrs: dict[str, str | bool] = field(default_factory=dict)
+    string: bool = False
+    predicate: Optional[Callable[[Tag], bool]] = None
+    within: Optional['Selector'] = None
+
+    def matches(self, tag: Tag) -> bool:
+        """Checks if a tag is matched by the selector.
+
+        :param tag: The tag to check.
+        :return: Whether it matches.
+        """
+        if tag.name != self.name:
+            return False
+
+        if self.class_ is not None:
+            classes: list[str] = tag.get('class') or []  # type: ignore
+
+            if self.class_ not in classes and ' '.join(classes) != self.class_:
+                return False
+
+        for attribute, value in self.attrs.items():
+            if attribute not in tag.attrs:
+                return False
+
+            if value is not True and tag.attrs[attribute] != value:
+                return False
+
+        if self.string and tag.string is None:
+            return False
+
+        if self.predicate is not None and not self.predicate(tag):
+            return False
+
+        if self.within is not None and not any(self.within.matches(parent) for parent in tag.parents):
+            return False
+
+        return True
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Describes how to find an element of a page.
+
+    :param name: The name of the element in the results.
+    :param selector: The selector of the element.
+    :param process: An optional post processor applied to the found element(s).
+    :param many: If every match is wanted (like ``find_all``) instead of the first one (like ``find``).
+    """
+    name: str
+    selector: Selector
+    process: Optional[Callable[[Any], Any]] = None
+    many: bool = False
+
+    def find(self, soup: BeautifulSoup | Tag) -> Any:
+        """Finds the element on its own, for when a single field is needed.
+
+        :param soup: The soupified page.
+        :return: The processed element(s).
+        """
+        return FieldExtractor([self]).extract(soup)[self.name]
+
+    def finish(self, found: Any) -> Any:
+        """Applies the post processor to what was found.
+
+        :param found: The element, ``None`` or the list of elements.
+        :return: The processed value.
+        """
+        return self.process(found) if self.process is not None else found
+
+
+class FieldExtractor:
+    """Finds every field of a page in a single walk of the tree.
+
+    :param specs: The specs of the fields to find.
+    """
+    specs: list[FieldSpec]
+
+    def __init__(self, specs: list[FieldSpec]) -> None:
+        self.specs = specs
+
+        self._by_name: dict[str, list[FieldSpec]] = {}
+        for spec in specs:
+            self._by_name.setdefault(spec.selector.name, []).append(spec)
+
+        self._stops_early: bool = not any(spec.many for spec in specs)
+
+    def extract(self, soup: BeautifulSoup | Tag) -> dict[str, Any]:
+        """Walks the page once and fills every field.
+
+        :param soup: The soupified page.
+        :return: The processed element(s) of each field, by name.
+        """
+        found: dict[str, Any] = {spec.name: [] if spec.many else None for spec in self.specs}
+        remaining: int = len(self.specs)
+
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+
+            for spec in self._by_name.get(element.name, ()):
+                if spec.many:
+                    if spec.selector.matches(element):
+                        found[spec.name].append(element)
+                elif found[spec.name] is None and spec.selector.matches(element):
+                    found[spec.name] = element
+                    remaining -= 1
+
+            if self._stops_early and not remaining:
+                break
+
+        return {spec.name: spec.finish(found[spec.name]) for spec in self.specs}
+
+
+def grandparent(element: Optional[Tag]) -> Optional[Tag]:
+    """Gets the parent of the parent of an element.
+
+    :param element: The element.
+    :return: Its grandparent, ``None`` if it doesn't have one.
+    """
+    if element is None or element.parent is None:
+        return None
+
+    return element.parent.parent
@@ -1,33 +1,90 @@
-import pandas as pd
-from pandas import DataFrame
+import argparse
+
 from ListAm import ListAm
 from EstateAm import EstateAm
 from RealEstateAm import RealEstateAm
+from ListingScrapperBase import COLUMNS
+from archive import HtmlArchive
+from browser import BrowserProfile
+from driver_pool import DriverPool
+from metrics import Metrics
+from pipeline import ListingPipeline
+from storage import TsvWriter, load_links
 
 # import selenium.webdriver as webdriver
 import undetected_chromedriver as uc  # type: ignore
 
-options = uc.ChromeOptions()
-options.add_argument('--blink-settings=imagesEnabled=false')
+DRIVERS = 4  # number of chrome instances the listings pages are spread over
+PARSERS = 2  # threads parsing the loaded pages while the drivers load the next ones
+PARSE_QUEUE = 16  # loaded pages waiting to be parsed before the drivers are held
+PARSE_IN_PROCESSES = False  # parse in PARSERS processes instead of threads, to use more cores
+HOUSINGS = 'csvs/housings.csv'
+CHECKPOINTS = 'csvs/checkpoints'  # progress of the interrupted crawls, resumed by the next run
+ARCHIVE = 'csvs/archive'  # the fetched pages, to extract them again without crawling
+REPARSED = 'csvs/reparsed.csv'
+METRICS = 'csvs/metrics'  # the time spent in each stage and the failures, as .json and .prom (prometheus)
+KNOWN_PAGES = 2  # the galleries are newest first, stop once this many pages only hold known listings
+PROFILE = BrowserProfile(headless=True)  # the fonts, trackers, map tiles, ... of each site are refused
+
+
+def new_driver() -> uc.Chrome:
+    options = uc.ChromeOptions()
+    PROFILE.configure(options)
+
+    return uc.Chrome(options=options, headless=PROFILE.headless)
+
+
+def main() -> None:
+    pool = DriverPool(new_driver, size=DRIVERS)
+    pipeline = ListingPipeline(pool, parse_workers=PARSERS, queue_depth=PARSE_QUEUE, use_processes=PARSE_IN_PROCESSES)
+    archive = HtmlArchive(ARCHIVE)
+    metrics = Metrics()
+
+    processed = load_links(HOUSINGS)  # only the links of the history are needed, for the deduplication
+    writer = TsvWriter(HOUSINGS, COLUMNS)
+
+    try:
+        for scrapper in (ListAm, EstateAm, RealEstateAm):
+            scrapper(pool.primary,
+                     limit_per_category=10,
+                     processed=processed,
+                     driver_pool=pool,
+                     checkpoint_dir=CHECKPOINTS,
+                     stop_after_known_pages=KNOWN_PAGES,
+                     pipeline=pipeline,
+                     archive=archive,
+                     metrics=metrics,
+                     browser_profile=PROFILE).save_data(writer)
+    finally:
+        writer.close()
+        pool.quit()
 
-driver = uc.Chrome(options=options)
+        metrics.report()
+        metrics.write_json(f'{METRICS}.json')
+        metrics.write_prometheus(f'{METRICS}.prom')
 
 
-df: DataFrame = pd.read_csv('csvs/housings.csv', sep='\t', header=0)
-processed = list(df.links)
+def reparse() -> None:
+    """Extracts every archived listing again, e.g. after a fix of the extraction, without opening a browser."""
+    archive = HtmlArchive(ARCHIVE, replay=True)
+    writer = TsvWriter(REPARSED, COLUMNS)
 
-new_df = ListAm(driver, limit_per_category=10, processed=processed).to_data_frame()
-if len(new_df) > 0:
-    df = pd.concat([df, new_df], ignore_index=True, sort=False)
+    try:
+        for scrapper in (ListAm, EstateAm, RealEstateAm):
+            replayed = scrapper(None, archive=archive)
 
-new_df = EstateAm(driver, limit_per_category=10, processed=processed).to_data_frame()
-if len(new_df) > 0:
-    df = pd.concat([df, new_df], ignore_index=True, sort=False)
+            for df in replayed.chunk_data_frames(replayed.iter_archived_listings()):
+                writer.write(df)
+    finally:
+        writer.close()
 
-new_df = RealEstateAm(driver, limit_per_category=10, processed=processed).to_data_frame()
-if len(new_df) > 0:
-    df = pd.concat([df, new_df], ignore_index=True, sort=False)
 
-df.to_csv('csvs/housings.csv', sep='\t', index=False)
+if __name__ == '__main__':  # the parsing processes import this module
+    arguments = argparse.ArgumentParser(description="Crawls the listings of the sites.")
+    arguments.add_argument('command', nargs='?', choices=['crawl', 'reparse'], default='crawl',
+                           help="crawl the sites, or extract the archived pages again into " + REPARSED)
 
-driver.close()
+    if arguments.parse_args().command == 'reparse':
+        reparse()
+    else:
+        main()
@@ -0,0 +1,180 @@
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Final, Iterator
+
+from rich import print
+
+PREFIX: Final[str] = 'scrapper'
+BUCKETS: Final[tuple[float, ...]] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40)  # seconds
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value for the prometheus text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """The distribution of a duration, in cumulative buckets like prometheus."""
+    counts: list[int]
+    total: float
+    count: int
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last one is +Inf
+        self.total = 0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Adds a duration to the distribution."""
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> dict[str, int]:
+        """The number of observations under each bound."""
+        buckets: dict[str, int] = {}
+        running: int = 0
+
+        for bound, count in zip([*map(str, BUCKETS), '+Inf'], self.counts):
+            running += count
+            buckets[bound] = running
+
+        return buckets
+
+
+class Metrics:
+    """Records what a crawl spends its time on, shared by the scrappers and safe to use from several threads.
+
+    The durations go in histograms and the events in counters, both identified by a name and labels
+    (e.g. the site, the category and the stage). They can be exported as json or in the prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, str]) -> tuple[str, Labels]:
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Records a duration.
+
+        :param name: The name of the histogram.
+        :param seconds: The duration.
+        :param labels: The labels of the duration.
+        """
+        with self._lock:
+            self._histograms.setdefault(self._key(name, labels), Histogram()).observe(seconds)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Counts an event.
+
+        :param name: The name of the counter.
+        :param amount: The number of events.
+        :param labels: The labels of the event.
+        """
+        key = self._key(name, labels)
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        """Records the duration of a block, even if it raises.
+
+        :param name: The name of the histogram.
+        :param labels: The labels of the duration.
+        """
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The metrics as a json serializable dictionary."""
+        with self._lock:
+            return {
+                'histograms': [{'name': name, 'labels': dict(labels), 'count': histogram.count,
+                                'sum': histogram.total, 'buckets': histogram.cumulative()}
+                               for (name, labels), histogram in sorted(self._histograms.items())],
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self._counters.items())],
+            }
+
+    def to_prometheus(self) -> str:
+        """The metrics in the prometheus text exposition format."""
+
+        def labelled(labels: dict[str, str]) -> str:
+            escaped: str = ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+            return f"{{{escaped}}}" if escaped else ""
+
+        lines: list[str] = []
+        metrics: dict[str, Any] = self.to_dict()
+
+        for name in dict.fromkeys(histogram['name'] for histogram in metrics['histograms']):
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+
+            for histogram in metrics['histograms']:
+                if histogram['name'] != name:
+                    continue
+
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f"{PREFIX}_{name}_bucket{labelled(histogram['labels'] | {'le': bound})} {count}")
+
+                lines.append(f"{PREFIX}_{name}_sum{labelled(histogram['labels'])} {histogram['sum']}")
+                lines.append(f"{PREFIX}_{name}_count{labelled(histogram['labels'])} {histogram['count']}")
+
+        for name in dict.fromkeys(counter['name'] for counter in metrics['counters']):
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+
+            for counter in metrics['counters']:
+                if counter['name'] == name:
+                    lines.append(f"{PREFIX}_{name}{labelled(counter['labels'])} {counter['value']}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str) -> None:
+        """Saves the metrics as json.
+
+        :param path: The path of the file.
+        """
+        self._write(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """Saves the metrics as a prometheus text file (e.g. for the textfile collector of the node exporter).
+
+        :param path: The path of the file.
+        """
+        self._write(path, self.to_prometheus())
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        destination = Path(path)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary: Path = destination.with_suffix('.tmp')  # replaced at once, a collector never reads half a file
+        temporary.write_text(content, encoding='utf-8')
+        temporary.replace(destination)
+
+    def report(self) -> None:
+        """Prints the time spent in each stage and the counters."""
+        metrics: dict[str, Any] = self.to_dict()
+
+        for histogram in metrics['histograms']:
+            labels: str = ' '.join(f"{key}={value}" for key, value in histogram['labels'].items())
+            print(f"{histogram['name']} {labels}: {histogram['count']} in {histogram['sum']:.1f}s "
+                  f"({histogram['sum'] / histogram['count'] * 1000:.0f}ms each)")
+
+        for counter in metrics['counters']:
+            labels = ' '.join(f"{key}={value}" for key, value in counter['labels'].items())
+            print(f"{counter['name']} {labels}: {counter['value']:g}")
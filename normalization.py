@@ -0,0 +1,46 @@
+from typing import Final, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+import currency_coverter
+from currency_coverter import RateProvider
+
+TARGET_CURRENCY: Final[str] = 'USD'
+
+
+def normalize_prices(df: DataFrame, to: str = TARGET_CURRENCY, provider: Optional[RateProvider] = None) -> DataFrame:
+    """Converts the raw prices of the listings and computes their price per square meter, column-wise.
+
+    It only needs the ``raw_price``, ``currency`` and ``square_meters`` columns, so it can be run again
+    with new rates on data that was already scrapped.
+
+    :param df: The listings, a ``price_per_meter`` given by the site (in the listing currency) is used where it isn't empty.
+    :param to: The currency to convert the prices to.
+    :param provider: The provider of the rates, defaults to the one of :mod:`currency_coverter`.
+    :return: The listings with their ``price`` and ``price_per_meter`` columns filled.
+    """
+    provider = provider or currency_coverter.provider
+
+    df = df.copy()
+
+    currencies: pd.Series = df['currency'].astype('string')
+    rates: dict[str, Optional[float]] = {currency: provider.rate(currency, to) for currency in currencies.dropna().unique()}
+
+    raw_prices: pd.Series = pd.to_numeric(df['raw_price'], errors='coerce')
+
+    conversion: pd.Series = currencies.map(rates).astype('float64')
+
+    df['price'] = raw_prices * conversion
+
+    square_meters: pd.Series = pd.to_numeric(df['square_meters'], errors='coerce')
+    given: pd.Series = pd.to_numeric(df['price_per_meter'], errors='coerce') * conversion \
+        if 'price_per_meter' in df.columns else pd.Series(np.nan, index=df.index)
+
+    computable: pd.Series = (df['price'] > 0) & (square_meters > 0)
+    computed: pd.Series = (df['price'] / square_meters).where(computable)
+
+    df['price_per_meter'] = given.where(given > 0, computed)
+
+    return df
@@ -0,0 +1,41 @@
+from typing import Final, Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+from rich import print
+
+FALLBACK_PARSER: Final[str] = 'html.parser'
+
+
+def _available(parser: str) -> bool:
+    try:
+        BeautifulSoup("", parser)
+        return True
+    except FeatureNotFound:
+        return False
+
+
+# lxml builds the same bs4 tree as html.parser several times faster, the finders work the same on both
+DEFAULT_PARSER: Final[str] = 'lxml' if _available('lxml') else FALLBACK_PARSER
+
+_warned: set[str] = set()
+
+
+def make_soup(html: str, parser: Optional[str] = None, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parses a page with the given parser backend, falling back to ``html.parser`` if it isn't installed.
+
+    :param html: The html string of the page.
+    :param parser: The name of the bs4 tree builder to use (``lxml``, ``html.parser``, ...), defaults to the fastest one available.
+    :param parse_only: An optional strainer, only the matching tags (and their content) are put in the tree.
+    :return: The soupified page.
+    """
+    parser = parser or DEFAULT_PARSER
+
+    try:
+        return BeautifulSoup(html, parser, parse_only=parse_only)
+    except FeatureNotFound:
+        if parser not in _warned:
+            _warned.add(parser)
+            print(f"Parser {parser} isn't installed, using {FALLBACK_PARSER}!")
+
+        return BeautifulSoup(html, FALLBACK_PARSER, parse_only=parse_only)
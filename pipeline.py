@@ -0,0 +1,182 @@
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from rich import print
+
+from driver_pool import DriverPool
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+@dataclass
+class PipelineStats:
+    """What a run of a :class:`ListingPipeline` spent its time on.
+
+    The fetch and parse times are summed over the workers, the waits are the time the crawl was blocked on the parsing.
+    """
+    fetched: int = 0
+    failed: int = 0
+    parsed: int = 0
+    fetch_seconds: float = 0
+    parse_seconds: float = 0
+    parse_wait_seconds: float = 0
+    peak_queue: int = 0
+
+    def summary(self) -> str:
+        """A one line description of the statistics."""
+        return (f"{self.fetched} pages fetched ({self.failed} failed) in {self.fetch_seconds:.1f}s, "
+                f"{self.parsed} parsed in {self.parse_seconds:.1f}s, "
+                f"{self.parse_wait_seconds:.1f}s waiting on the parsing, queue peak {self.peak_queue}")
+
+
+def _parse_chunk(parse: Callable[[T, str], Optional[R]],
+                 chunk: list[tuple[T, Optional[str]]]) -> tuple[list[Optional[R]], list[float]]:
+    """Parses a chunk of loaded pages, in a thread or in another process.
+
+    :param parse: The parsing function.
+    :param chunk: The items and their html, ``None`` if the page couldn't be loaded.
+    :return: The results and the time spent parsing each loaded page.
+    """
+    results: list[Optional[R]] = []
+    times: list[float] = []
+
+    for item, html in chunk:
+        if html is None:
+            results.append(None)
+            continue
+
+        start: float = time.perf_counter()
+        results.append(parse(item, html))
+        times.append(time.perf_counter() - start)
+
+    return results, times
+
+
+class ListingPipeline:
+    """Loads the listings pages on the drivers of a pool and parses them in other threads, so both overlap.
+
+    A driver is given back to the pool as soon as its page is loaded, the html waits for the parsers in a bounded queue.
+    When the queue is full, the loading of new pages is held until a page is parsed.
+
+    The parsing can also run in other processes, to use more than one core. The pages are then sent in chunks,
+    and the parsing function, the items and the results have to be picklable.
+
+    :param driver_pool: The drivers the pages are loaded on.
+    :param parse_workers: The number of threads (or processes) parsing the pages.
+    :param queue_depth: The maximum number of loaded pages waiting for (or being) parsed.
+    :param use_processes: Whether to parse in a pool of processes instead of threads.
+    :param chunk_size: The number of pages sent at once to a process.
+    """
+    driver_pool: DriverPool
+    parse_workers: int
+    queue_depth: int
+    use_processes: bool
+    chunk_size: int
+    stats: PipelineStats
+
+    def __init__(self,
+                 driver_pool: DriverPool,
+                 parse_workers: int = 2,
+                 queue_depth: int = 16,
+                 use_processes: bool = False,
+                 chunk_size: int = 8) -> None:
+        self.driver_pool = driver_pool
+        self.parse_workers = parse_workers
+        self.queue_depth = max(queue_depth, 1)
+        self.use_processes = use_processes
+        self.chunk_size = max(chunk_size, 1) if use_processes else 1  # no need to batch for threads
+        self.stats = PipelineStats()
+        self._lock = Lock()
+
+    def run(self,
+            fetch: Callable[[WebDriver, T], Optional[str]],
+            parse: Callable[[T, str], Optional[R]],
+            items: Iterable[T],
+            observe: Optional[Callable[[float], None]] = None) -> Iterator[Optional[R]]:
+        """Runs ``parse(item, fetch(driver, item))`` for every item.
+
+        The results are yielded in the order of the items, ``None`` for the items whose page couldn't be loaded.
+        The statistics of the run are kept in :attr:`stats`.
+
+        :param fetch: The function loading the html of an item on a driver, ``None`` if it failed.
+        :param parse: The function extracting the result from the html of an item, picklable with :attr:`use_processes`.
+        :param items: The items to process.
+        :param observe: An optional function given the time spent parsing each page, e.g. for metrics.
+        :return: An iterator over the results.
+        """
+        self.stats = PipelineStats()
+
+        def timed_fetch(webdriver: WebDriver, item: T) -> tuple[T, Optional[str]]:
+            start: float = time.perf_counter()
+            html: Optional[str] = fetch(webdriver, item)
+
+            with self._lock:
+                self.stats.fetch_seconds += time.perf_counter() - start
+
+            return item, html
+
+        executor: Executor = ProcessPoolExecutor(max_workers=self.parse_workers) if self.use_processes \
+            else ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix='parser')
+
+        try:
+            pending: deque[Future[tuple[list[Optional[R]], list[float]]]] = deque()
+            queued: int = 0  # the pages in the pending chunks
+            chunk: list[tuple[Optional[T], Optional[str]]] = []
+
+            for fetched in self.driver_pool.imap(timed_fetch, items):
+                self.stats.fetched += 1
+
+                if fetched is None or fetched[1] is None:  # the driver crashed or the page couldn't be loaded
+                    self.stats.failed += 1
+
+                chunk.append(fetched or (None, None))
+
+                if len(chunk) >= self.chunk_size:
+                    pending.append(executor.submit(_parse_chunk, parse, chunk))
+                    queued += len(chunk)
+                    chunk = []
+
+                self.stats.peak_queue = max(self.stats.peak_queue, queued + len(chunk))
+
+                while pending and (queued >= self.queue_depth or pending[0].done()):
+                    results: list[Optional[R]] = self._results(pending.popleft(), observe)
+                    queued -= len(results)
+                    yield from results
+
+            if chunk:
+                pending.append(executor.submit(_parse_chunk, parse, chunk))
+
+            while pending:
+                yield from self._results(pending.popleft(), observe)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _results(self,
+                 future: Future[tuple[list[Optional[R]], list[float]]],
+                 observe: Optional[Callable[[float], None]]) -> list[Optional[R]]:
+        if not future.done():
+            start: float = time.perf_counter()
+            future.result()
+            self.stats.parse_wait_seconds += time.perf_counter() - start
+
+        results, times = future.result()
+
+        self.stats.parse_seconds += sum(times)
+        self.stats.parsed += len(times)
+
+        if observe is not None:
+            for seconds in times:
+                observe(seconds)
+
+        return results
+
+    def report(self) -> None:
+        """Prints the statistics of the last run."""
+        print(f"Pipeline: {self.stats.summary()}")
@@ -0,0 +1,367 @@
+import ast
+import csv
+import os
+import sqlite3
+from collections.abc import Iterator, MutableSet
+from pathlib import Path
+from threading import Lock
+from typing import Any, Final, Protocol
+from urllib import parse
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+
+class ListingWriter(Protocol):
+    """The interface of the places the listings are saved to."""
+
+    def write(self, df: DataFrame) -> None:
+        """Adds listings to the writer, they are saved at the latest on the next :meth:`flush`."""
+        ...
+
+    def flush(self) -> None:
+        """Saves the pending listings."""
+        ...
+
+    def close(self) -> None:
+        """Saves the pending listings and releases the writer."""
+        ...
+
+
+def load_links(path: str) -> set[str]:
+    """Loads the links of the listings of a tsv file, without loading the rest of the columns.
+
+    :param path: The path of the tsv file.
+    :return: The links, empty if the file doesn't exist yet.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    return set(pd.read_csv(path, sep='\t', usecols=['links'])['links'].dropna())
+
+
+class BatchedWriter:
+    """The base of the writers that keep the listings in memory until ``batch_size`` of them are pending.
+
+    A crash only loses the listings of the current batch.
+
+    :param batch_size: The number of pending listings that triggers a write.
+    """
+    batch_size: int
+
+    def __init__(self, batch_size: int = 100) -> None:
+        self.batch_size = batch_size
+
+        self._pending: list[DataFrame] = []
+        self._pending_rows: int = 0
+
+    def write(self, df: DataFrame) -> None:
+        if df.empty:
+            return
+
+        self._pending.append(df)
+        self._pending_rows += len(df)
+
+        if self._pending_rows >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        self._write_batch(pd.concat(self._pending, ignore_index=True, sort=False))
+
+        self._pending.clear()
+        self._pending_rows = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def _write_batch(self, batch: DataFrame) -> None:
+        ...
+
+
+class TsvWriter(BatchedWriter):
+    """Appends listings at the end of a tsv file, so a run only writes its own listings.
+
+    :param path: The path of the tsv file, it is created if it doesn't exist.
+    :param columns: The columns of the listings, in order.
+    :param batch_size: The number of pending listings that triggers a write.
+    """
+    path: Path
+    columns: list[str]
+
+    def __init__(self, path: str, columns: list[str], batch_size: int = 100) -> None:
+        super().__init__(batch_size)
+
+        self.path = Path(path)
+        self.columns = self._prepare(list(columns))
+
+    def _prepare(self, columns: list[str]) -> list[str]:
+        """Reads the header of the existing file, adding the missing columns to it if needed.
+
+        :param columns: The columns of the listings.
+        :return: The columns of the file.
+        """
+        if not self.path.exists() or not self.path.stat().st_size:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            DataFrame(columns=columns).to_csv(self.path, sep='\t', index=False)
+            return columns
+
+        with self.path.open(newline='', encoding='utf-8') as file:
+            header: list[str] = next(csv.reader(file, delimiter='\t'))
+
+        missing: list[str] = [column for column in columns if column not in header]
+
+        if missing:  # only once, when the file was written before the columns existed
+            self._rewrite(header + missing)
+
+        return header + missing
+
+    def _rewrite(self, columns: list[str]) -> None:
+        temporary: Path = self.path.with_suffix('.tmp')
+
+        with temporary.open('w', newline='', encoding='utf-8') as file:
+            DataFrame(columns=columns).to_csv(file, sep='\t', index=False)
+
+            for chunk in pd.read_csv(self.path, sep='\t', chunksize=50_000):
+                chunk.reindex(columns=columns).to_csv(file, sep='\t', index=False, header=False)
+
+        temporary.replace(self.path)
+
+    def _write_batch(self, batch: DataFrame) -> None:
+        with self.path.open('a', newline='', encoding='utf-8') as file:
+            batch.reindex(columns=self.columns).to_csv(file, sep='\t', index=False, header=False)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+FLOAT_COLUMNS: Final[list[str]] = ['price', 'raw_price', 'rooms', 'square_meters', 'price_per_meter', 'floor',
+                                   'building_floors', 'height', 'bathroom']
+CATEGORY_COLUMNS: Final[list[str]] = ['source', 'type', 'rent_or_sale', 'renovation', 'currency']
+STRING_COLUMNS: Final[list[str]] = ['id', 'address', 'links']
+
+
+def _coordinates(shape: Any) -> tuple[float, float]:
+    """Reads the longitude and latitude of a ``SHAPE``, a dict or its string once saved in a tsv."""
+    if isinstance(shape, str):
+        try:
+            shape = ast.literal_eval(shape)
+        except (ValueError, SyntaxError):
+            return np.nan, np.nan
+
+    if not isinstance(shape, dict):
+        return np.nan, np.nan
+
+    return pd.to_numeric(shape.get('x'), errors='coerce'), pd.to_numeric(shape.get('y'), errors='coerce')
+
+
+def to_typed(df: DataFrame) -> DataFrame:
+    """Gives the listings a fixed schema, for the columnar formats.
+
+    The numbers are floats, the low cardinality columns categoricals, ``SHAPE`` is split into ``lon``/``lat``,
+    and ``site``/``crawl_date`` are added to partition the data by.
+
+    :param df: The listings, as given by :meth:`ListingScrapperBase.to_data_frame` or read from the tsv.
+    :return: The typed listings.
+    """
+    typed = DataFrame(index=df.index)
+
+    for column in STRING_COLUMNS:
+        typed[column] = df[column].astype('string') if column in df else pd.Series(pd.NA, index=df.index, dtype='string')
+
+    typed['id'] = typed['id'].str.replace(r'\.0$', '', regex=True)  # list.am ids are parsed as floats
+
+    for column in FLOAT_COLUMNS:
+        typed[column] = pd.to_numeric(df[column], errors='coerce').astype('float64') if column in df else np.nan
+
+    for column in CATEGORY_COLUMNS:
+        typed[column] = (df[column] if column in df else pd.Series(pd.NA, index=df.index)) \
+            .replace('', pd.NA).astype('string').astype('category')
+
+    furniture = df['furniture'] if 'furniture' in df else pd.Series(pd.NA, index=df.index)
+    typed['furniture'] = furniture.map({True: True, False: False, 'True': True, 'False': False}).astype('boolean')
+
+    coordinates = [_coordinates(shape) for shape in df['SHAPE']] if 'SHAPE' in df else []
+    typed['lon'] = pd.Series([lon for lon, _ in coordinates], index=df.index, dtype='float64')
+    typed['lat'] = pd.Series([lat for _, lat in coordinates], index=df.index, dtype='float64')
+
+    typed['date'] = pd.to_datetime(df['date'], errors='coerce') if 'date' in df else pd.NaT
+    typed['site'] = typed['source'].astype('string').map(lambda source: parse.urlsplit(source).netloc,
+                                                         na_action='ignore').fillna('unknown')
+    typed['crawl_date'] = typed['date'].dt.strftime('%Y-%m-%d').fillna('unknown')
+
+    return typed
+
+
+SQLITE_COLUMNS: Final[dict[str, str]] = {
+    'source': 'TEXT NOT NULL', 'id': 'TEXT NOT NULL', 'links': 'TEXT', 'address': 'TEXT',
+    'type': 'TEXT', 'rent_or_sale': 'TEXT', 'renovation': 'TEXT', 'currency': 'TEXT', 'furniture': 'INTEGER',
+    **{column: 'REAL' for column in FLOAT_COLUMNS},
+    'lon': 'REAL', 'lat': 'REAL', 'date': 'TEXT', 'crawl_date': 'TEXT',
+}
+
+
+class ParquetWriter(BatchedWriter):
+    """Writes listings to a parquet dataset with a fixed schema, partitioned by site and crawl date.
+
+    Every batch is added as new files in the partitions (``site=.../crawl_date=...``), nothing is ever rewritten.
+    It needs ``pyarrow``.
+
+    :param root: The directory of the dataset.
+    :param batch_size: The number of pending listings that triggers a write.
+    """
+    root: Path
+
+    def __init__(self, root: str, batch_size: int = 1000) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("pyarrow is needed to write parquet files (pip install pyarrow)") from e
+
+        super().__init__(batch_size)
+
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _write_batch(self, batch: DataFrame) -> None:
+        to_typed(batch).to_parquet(self.root, engine='pyarrow', index=False, partition_cols=['site', 'crawl_date'])
+
+
+def export_tsv(path: str, writer: ListingWriter, chunk_size: int = 50_000) -> None:
+    """Gives the listings of a tsv file to a writer in chunks, e.g. to convert the history to parquet.
+
+    :param path: The path of the tsv file.
+    :param writer: The writer to give the listings to.
+    :param chunk_size: The number of listings read at once.
+    """
+    for chunk in pd.read_csv(path, sep='\t', chunksize=chunk_size):
+        writer.write(chunk)
+
+    writer.flush()
+
+
+class SqliteStore(BatchedWriter):
+    """Keeps the listings in a sqlite database, one row per (``source``, ``id``).
+
+    Every batch is upserted in a single transaction, and the ``links`` and ``crawl_date`` columns are indexed,
+    so checking if a listing was already processed doesn't need to load the history.
+    The columns are the ones of :func:`to_typed`.
+
+    :param path: The path of the database, it is created if it doesn't exist.
+    :param batch_size: The number of pending listings that triggers a write.
+    """
+    path: Path
+
+    def __init__(self, path: str, batch_size: int = 100) -> None:
+        super().__init__(batch_size)
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        definitions: str = ', '.join(f'{column} {kind}' for column, kind in SQLITE_COLUMNS.items())
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS listings ({definitions}, PRIMARY KEY (source, id))")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS listings_links ON listings (links)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS listings_crawl_date ON listings (crawl_date)")
+
+    def _write_batch(self, batch: DataFrame) -> None:
+        typed: DataFrame = to_typed(batch)
+        typed['date'] = typed['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        columns: list[str] = list(SQLITE_COLUMNS)
+        rows: list[tuple[Any, ...]] = [
+            tuple(None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value for value in row)
+            for row in typed[columns].astype(object).itertuples(index=False, name=None)
+        ]
+
+        updates: str = ', '.join(f'{column} = excluded.{column}' for column in columns if column not in ('source', 'id'))
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT INTO listings ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (source, id) DO UPDATE SET {updates}",
+                rows,
+            )
+
+    def close(self) -> None:
+        super().close()
+        self._connection.close()
+
+    def has_link(self, link: str) -> bool:
+        """Checks if a listing is in the database.
+
+        :param link: The link of the listing.
+        :return: Whether it is there.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM listings WHERE links = ? LIMIT 1", (link,)).fetchone() is not None
+
+    def links(self) -> Iterator[str]:
+        """Iterates over the links of the stored listings."""
+        with self._lock:
+            rows: list[tuple[str]] = self._connection.execute("SELECT links FROM listings").fetchall()
+
+        for (link,) in rows:
+            yield link
+
+    def count(self) -> int:
+        """Counts the stored listings."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def query(self, sql: str, params: tuple[Any, ...] = ()) -> DataFrame:
+        """Runs a read query on the database.
+
+        :param sql: The query, the table is ``listings``.
+        :param params: The parameters of the query.
+        :return: The results.
+        """
+        with self._lock:
+            return pd.read_sql_query(sql, self._connection, params=params)
+
+    def processed_links(self) -> 'StoredLinks':
+        """Gives a set of processed links backed by the database, to give to the scrappers.
+
+        :return: The set.
+        """
+        return StoredLinks(self)
+
+
+class StoredLinks(MutableSet[str]):
+    """The processed links of a :class:`SqliteStore`, looked up in the database instead of being loaded.
+
+    The links added during a run are kept in memory, a listing is only in the database once it has been scrapped.
+
+    :param store: The store of the listings.
+    """
+
+    def __init__(self, store: SqliteStore) -> None:
+        self.store = store
+        self._added: set[str] = set()
+
+    def __contains__(self, link: object) -> bool:
+        return link in self._added or (isinstance(link, str) and self.store.has_link(link))
+
+    def __iter__(self) -> Iterator[str]:
+        seen: set[str] = set(self._added)
+        yield from self._added
+
+        for link in self.store.links():
+            if link not in seen:
+                yield link
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def add(self, link: str) -> None:
+        self._added.add(link)
+
+    def discard(self, link: str) -> None:
+        self._added.discard(link)